@@ -1,11 +1,13 @@
+import io
 import re
 from collections import deque
 import os
 import json
+from log_reader import COMPRESSED_SUFFIXES, open_log
 
 def tail(filename, n=10):
-    """Read the last n lines from the given file."""
-    with open(filename, 'r', errors='replace') as file:
+    """Read the last n lines from the given file, decompressing .gz/.bz2/.xz/.zst logs on the fly."""
+    with io.TextIOWrapper(open_log(filename), errors='replace') as file:
         return deque(file, n)
 
 def clean_line(line):
@@ -50,12 +52,14 @@ def clean_and_extract_response_fields(line):
 
 # Use the Downloads folder as the log_directory
 downloads_directory = os.path.join(os.path.expanduser('~'), 'Downloads')
+# Exported logs, plain or individually compressed
+LOG_FILE_SUFFIXES = ('.txt',) + tuple('.txt' + suffix for suffix in COMPRESSED_SUFFIXES)
 
 # Ask the user for the date
 target_date = input("Enter the date (YYYY-MM-DD): ")
 
 # Find matching log files
-matching_files = [os.path.join(downloads_directory, f) for f in os.listdir(downloads_directory) if f.startswith(f'wso2carbon-{target_date}') and f.endswith('.txt')]
+matching_files = [os.path.join(downloads_directory, f) for f in os.listdir(downloads_directory) if f.startswith(f'wso2carbon-{target_date}') and f.endswith(LOG_FILE_SUFFIXES)]
 
 # Print found log files
 print("\nFound Log Files:")
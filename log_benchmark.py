@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import socket
+import hashlib
+import argparse
+import platform
+import importlib.util
+import contextlib
+import subprocess
+from datetime import datetime
+from log_cache import DEFAULT_CACHE_DIR
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then reported as None
+    resource = None
+
+ANALYZER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test-2-Linux-5.py')
+ANALYZER_MODULE = 'wso2_analyzer'
+DEFAULT_DATA_DIR = os.path.join(DEFAULT_CACHE_DIR, 'benchmark', 'data')
+DEFAULT_RESULTS_PATH = os.path.join(DEFAULT_CACHE_DIR, 'benchmark', 'results.json')
+BENCHMARK_DATE = '2024-01-20'
+BENCHMARK_HOST = 'bench01'
+CASES = ('text', 'bytes', 'workers', 'cached-cold', 'cached-warm')
+SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+WRITE_BUFFER_BYTES = 8 * 1024 * 1024
+
+# (responseCode, responseMessage, hostResponseCode, weight), roughly a production day's mix
+DEFAULT_CODE_MIX = (
+    ('0', 'Approved', '00', 40),
+    ('0', 'Approved', '002', 10),
+    ('51', 'Insufficient funds', '51', 15),
+    ('05', 'Do not honor', '05', 10),
+    ('91', 'Issuer unavailable', '91', 8),
+    ('8', 'Host error', '905', 7),
+    ('4000001', 'Invalid request', 'NA', 5),
+    ('14', 'Invalid card number', '14', 5),
+)
+# Share of lines of each kind; the rest are unrelated INFO lines
+IN_MESSAGE_SHARE = 0.30
+OUT_RESPONSE_SHARE = 0.27
+OUT_STATUS_SHARE = 0.03
+STACK_TRACE_SHARE = 0.05
+LINE_PREFIX = "TID: [-1234] [] [{} {}]  INFO {{org.apache.synapse.mediators.builtin.LogMediator}} - "
+AVERAGE_LINE_BYTES = 210
+
+def parse_size(size):
+    """'500M', '2G' or a plain byte count to bytes."""
+    size = size.strip().upper().rstrip('B')
+    if size and size[-1] in SIZE_UNITS:
+        return int(float(size[:-1]) * SIZE_UNITS[size[-1]])
+    return int(size)
+
+def parse_code_mix(mix):
+    """'0:50,51:20,91:10' to DEFAULT_CODE_MIX entries with new weights; unknown codes get a generic message."""
+    known = {code: (message, host_code) for code, message, host_code, _ in DEFAULT_CODE_MIX}
+    code_mix = []
+    for item in mix.split(','):
+        code, weight = item.split(':')
+        message, host_code = known.get(code.strip(), (f'Response {code.strip()}', code.strip()))
+        code_mix.append((code.strip(), message, host_code, float(weight)))
+    return tuple(code_mix)
+
+def generate_wso2_log(path, size_bytes, date=BENCHMARK_DATE, seed=1, code_mix=DEFAULT_CODE_MIX,
+                      certificate_rate=0.05, control_rate=0.02, malformed_rate=0.005):
+    """Write a time-ordered synthetic wso2carbon log of about size_bytes; the same arguments give the same file.
+
+    Timestamps are spread over the whole day. OUT_MESSAGE responses follow code_mix, and a share of
+    them carry a certificate, embedded control characters or truncated JSON, as on the real nodes.
+    Returns the number of lines written.
+    """
+    rng = random.Random(seed)
+    responses = [entry[:3] for entry in code_mix]
+    weights = [entry[3] for entry in code_mix]
+    seconds_per_line = 86400 / max(size_bytes // AVERAGE_LINE_BYTES, 1)
+    line_seconds = 0.0
+    written = 0
+    lines = 0
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', buffering=WRITE_BUFFER_BYTES, newline='\n') as file:
+        while written < size_bytes:
+            line_seconds = min(line_seconds + rng.expovariate(1 / seconds_per_line), 86399.999)
+            whole_seconds = int(line_seconds)
+            clock = (f"{whole_seconds // 3600:02d}:{whole_seconds % 3600 // 60:02d}:{whole_seconds % 60:02d},"
+                     f"{int((line_seconds - whole_seconds) * 1000):03d}")
+            uuid = '%032x' % rng.getrandbits(128)
+            uuid = f"{uuid[:8]}-{uuid[8:12]}-{uuid[12:16]}-{uuid[16:20]}-{uuid[20:]}"
+            kind = rng.random()
+            if kind < IN_MESSAGE_SHARE:
+                line = LINE_PREFIX.format(date, clock) + f"TXN = IN_MESSAGE, UUID = {uuid}, Payload = {{\"mti\":\"0100\"}}\n"
+            elif kind < IN_MESSAGE_SHARE + OUT_RESPONSE_SHARE:
+                response_code, response_message, host_code = rng.choices(responses, weights)[0]
+                if rng.random() < control_rate:
+                    response_message += '\x01\x1f'
+                body = ('{"responseCode":"%s","responseMessage":"%s","hostResponseCode":"%s",'
+                        '"additionalResponseData":{"actualResponseCode":"%s"}}') % (response_code, response_message, host_code, host_code)
+                if rng.random() < malformed_rate:
+                    body = body[:-3] + '}'
+                certificate = ", certificate = MIIBIjANBgkqhkiG9w0BAQEFAAOC" if rng.random() < certificate_rate else ""
+                line = (LINE_PREFIX.format(date, clock) + f"TXN = OUT_MESSAGE, UUID = {uuid}{certificate}, "
+                        f"--- Response --- = {body}, messageType = application/json\n")
+            elif kind < IN_MESSAGE_SHARE + OUT_RESPONSE_SHARE + OUT_STATUS_SHARE:
+                line = LINE_PREFIX.format(date, clock) + f"TXN = OUT_MESSAGE, UUID = {uuid}, status = sent\n"
+            elif kind < IN_MESSAGE_SHARE + OUT_RESPONSE_SHARE + OUT_STATUS_SHARE + STACK_TRACE_SHARE:
+                line = "\tat org.apache.synapse.core.axis2.Axis2Sender.sendOn(Axis2Sender.java:82)\n"
+            else:
+                line = LINE_PREFIX.format(date, clock) + f"Endpoint health check completed for {uuid[:8]} in 12 ms\n"
+            file.write(line)
+            written += len(line)
+            lines += 1
+    os.replace(temp_path, path)
+    return lines
+
+def prepare_data(args):
+    """Generate the benchmark backup tree once per parameter set and return (data dir, generation seconds)."""
+    parameters = [args.size, args.seed, args.mix, args.certificate_rate, args.control_rate, args.malformed_rate]
+    name = hashlib.sha1(json.dumps(parameters).encode()).hexdigest()[:12]
+    data_dir = os.path.join(args.data_dir, name)
+    log_dir = os.path.join(data_dir, BENCHMARK_HOST, 'backup_wso2', f"backup-{BENCHMARK_DATE.replace('-', '')}-0100")
+    log_path = os.path.join(log_dir, f'wso2carbon-{BENCHMARK_DATE}.log')
+    if os.path.exists(log_path):
+        return data_dir, 0.0
+    os.makedirs(log_dir, exist_ok=True)
+    print(f"Generating {args.size} of synthetic wso2carbon log in {log_dir} ...")
+    started = time.perf_counter()
+    code_mix = parse_code_mix(args.mix) if args.mix else DEFAULT_CODE_MIX
+    generate_wso2_log(log_path, parse_size(args.size), BENCHMARK_DATE, args.seed, code_mix,
+                      args.certificate_rate, args.control_rate, args.malformed_rate)
+    return data_dir, time.perf_counter() - started
+
+def load_analyzer():
+    """Import test-2-Linux-5.py, whose file name is not a valid module name, and register it so workers can unpickle its functions."""
+    if ANALYZER_MODULE in sys.modules:
+        return sys.modules[ANALYZER_MODULE]
+    spec = importlib.util.spec_from_file_location(ANALYZER_MODULE, ANALYZER_PATH)
+    analyzer = importlib.util.module_from_spec(spec)
+    sys.modules[ANALYZER_MODULE] = analyzer
+    spec.loader.exec_module(analyzer)
+    return analyzer
+
+def peak_rss_mb(who):
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+def run_case(case, data_dir, workers):
+    """Time one engine end to end in this process and return its measurements."""
+    analyzer = load_analyzer()
+    scratch_dir = os.path.join(data_dir, 'scratch')
+    analyzer.BACKUP_DIRECTORY_TEMPLATE = os.path.join(data_dir, '{}', 'backup_wso2')
+    analyzer.CATALOG_DIRECTORY = os.path.join(scratch_dir, 'catalog')
+    analyzer.INDEX_DIRECTORY = os.path.join(scratch_dir, 'index')
+    cache_dir = os.path.join(scratch_dir, 'aggregates')
+
+    stages = {}
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        log_files = analyzer.find_log_files(BENCHMARK_DATE, BENCHMARK_HOST)
+    stages['discovery'] = time.perf_counter() - started
+    total_bytes = sum(os.path.getsize(log_file) for log_file in log_files)
+
+    if case == 'cached-cold' and os.path.isdir(cache_dir):
+        for entry in os.scandir(cache_dir):
+            os.remove(entry.path)
+    started = time.perf_counter()
+    # The malformed JSON lines print a diagnostic each; keep them out of the timing output
+    with contextlib.redirect_stdout(io.StringIO()):
+        if case in ('text', 'bytes'):
+            aggregate = analyzer.process_log_files_serial(log_files, engine=case)
+        elif case == 'workers':
+            aggregate = analyzer.process_log_files_parallel(log_files, None, workers)
+        else:
+            aggregate = analyzer.process_log_files_cached(log_files, None, workers, analyzer.AggregateCache(cache_dir))
+    stages['parse'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.print_transaction_report(aggregate, BENCHMARK_DATE)
+    stages['report'] = time.perf_counter() - started
+
+    parse_seconds = stages['parse']
+    checksum = hashlib.sha1(json.dumps(sorted(aggregate.response_counts.items())).encode()).hexdigest()[:12]
+    return {
+        'case': case,
+        'workers': workers if case in ('workers', 'cached-cold', 'cached-warm') else None,
+        'lines': aggregate.lines,
+        'megabytes': round(total_bytes / (1024 * 1024), 1),
+        'lines_per_second': round(aggregate.lines / parse_seconds) if parse_seconds > 0 else None,
+        'megabytes_per_second': round(total_bytes / (1024 * 1024) / parse_seconds, 1) if parse_seconds > 0 else None,
+        'stage_seconds': {stage: round(seconds, 3) for stage, seconds in stages.items()},
+        'read_wait_seconds': round(aggregate.read_stats.wait_seconds, 3),
+        'peak_rss_mb': peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        'peak_worker_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+        'out_messages': aggregate.out_messages,
+        'response_checksum': checksum,
+    }
+
+def run_case_isolated(case, data_dir, workers):
+    """Run a case in a fresh interpreter, so its peak RSS is not inflated by the cases before it."""
+    command = [sys.executable, os.path.abspath(__file__), '--run-case', case, '--case-data-dir', data_dir]
+    if workers:
+        command += ['--workers', str(workers)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(f"Case {case} failed: {completed.stderr.strip()}")
+        return None
+    return json.loads(completed.stdout)
+
+def git_revision():
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(ANALYZER_PATH),
+                                   capture_output=True, text=True)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+def load_results(results_path):
+    try:
+        with open(results_path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return []
+
+def save_results(results_path, runs):
+    os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+    temp_path = f"{results_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as file:
+        file.write(json.dumps(runs, indent=2))
+    os.replace(temp_path, results_path)
+
+def previous_run(runs, parameters):
+    for run in reversed(runs):
+        if run['parameters'] == parameters:
+            return run
+    return None
+
+def print_results(run, baseline):
+    print(f"\nData: {run['parameters']['size']} ({run['cases'][0]['megabytes'] if run['cases'] else 0} MB), "
+          f"generated in {run['generation_seconds']:.1f}s; revision {run['revision']}")
+    print("Case\t\tLines/sec\tMB/sec\tParse s\tReport s\tPeak RSS MB\tWorker RSS MB\tvs last\tChecksum")
+    baseline_cases = {case['case']: case for case in baseline['cases']} if baseline else {}
+    for case in run['cases']:
+        previous = baseline_cases.get(case['case'])
+        change = ''
+        if previous and previous['lines_per_second'] and case['lines_per_second']:
+            change = f"{(case['lines_per_second'] / previous['lines_per_second'] - 1) * 100:+.1f}%"
+        print(f"{case['case'].ljust(12)}\t{case['lines_per_second']}\t\t{case['megabytes_per_second']}\t"
+              f"{case['stage_seconds']['parse']:.2f}\t{case['stage_seconds']['report']:.3f}\t\t{case['peak_rss_mb']}\t\t"
+              f"{case['peak_worker_rss_mb']}\t\t{change or '-'}\t{case['response_checksum']}")
+    if len({case['response_checksum'] for case in run['cases']}) > 1:
+        print("WARNING: the cases disagree on the response counts.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the wso2 analyzer engines on a reproducible synthetic log.')
+    parser.add_argument('--size', default='100M', help="Size of the generated log, e.g. '1M', '500M', '50G'.")
+    parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed and parameters give the same log.')
+    parser.add_argument('--mix', default=None, help="Response-code weights, e.g. '0:50,51:20,91:10' (default: a typical day).")
+    parser.add_argument('--certificate-rate', type=float, default=0.05, help='Share of responses that carry a certificate.')
+    parser.add_argument('--control-rate', type=float, default=0.02, help='Share of responses with control characters.')
+    parser.add_argument('--malformed-rate', type=float, default=0.005, help='Share of responses with truncated JSON.')
+    parser.add_argument('--cases', default=','.join(CASES), help=f"Comma-separated cases to run, from: {', '.join(CASES)}.")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='Processes for the workers and cached cases.')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Where generated logs are kept between runs.')
+    parser.add_argument('--results', default=DEFAULT_RESULTS_PATH, help='JSON file the results are appended to.')
+    parser.add_argument('--run-case', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--case-data-dir', default=None, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.case_data_dir, args.workers)))
+        return 0
+
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        print(f"Unknown case(s): {', '.join(unknown)}")
+        return 2
+    try:
+        parse_size(args.size)
+    except ValueError:
+        print(f"Invalid size: {args.size}")
+        return 2
+
+    data_dir, generation_seconds = prepare_data(args)
+    parameters = {
+        'size': args.size, 'seed': args.seed, 'mix': args.mix, 'certificate_rate': args.certificate_rate,
+        'control_rate': args.control_rate, 'malformed_rate': args.malformed_rate, 'workers': args.workers,
+    }
+    results = [result for result in (run_case_isolated(case, data_dir, args.workers) for case in cases) if result]
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'hostname': socket.gethostname(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'parameters': parameters,
+        'generation_seconds': round(generation_seconds, 1),
+        'cases': results,
+    }
+    runs = load_results(args.results)
+    print_results(run, previous_run(runs, parameters))
+    runs.append(run)
+    save_results(args.results, runs)
+    print(f"\nResults appended to {args.results}")
+    return 0 if len(results) == len(cases) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tarfile
+import threading
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on Windows; concurrent runs there are not coordinated
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'log_analyzer')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+AGGREGATE_SUFFIX = '.agg.json'
+
+DEFAULT_EXTRACT_DIR = os.path.join(DEFAULT_CACHE_DIR, 'extracted')
+DEFAULT_EXTRACT_MAX_BYTES = 4 * 1024 * 1024 * 1024
+# Written last into an entry, so an entry without it is a partial extraction
+EXTRACT_MARKER = 'members.json'
+
+def file_fingerprint(path):
+    """Return (absolute path, size, mtime_ns) for the file, or None if it cannot be stat'ed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+def evict_lru(directory, max_bytes, suffix=''):
+    """Delete the least recently used entries until the directory fits in max_bytes."""
+    entries = []
+    total_size = 0
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(suffix):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_size += stat.st_size
+    except FileNotFoundError:
+        return 0
+
+    removed = 0
+    # Entries are touched on every hit, so the oldest mtime is the least recently used
+    for _, size, path in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total_size -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+class AggregateCache:
+    """Per-file parse results keyed by path, size, mtime and parser version."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def entry_key(self, path, version, tag=''):
+        """Take the cache key before parsing, so a file that changes mid-scan is not cached under its new stat."""
+        fingerprint = file_fingerprint(path)
+        if fingerprint is None:
+            return None
+        # A changed size or mtime gives a new key, so stale entries are never read and age out by LRU
+        key = json.dumps([*fingerprint, version, tag])
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + AGGREGATE_SUFFIX)
+
+    def get(self, key):
+        if key is None:
+            return None
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r') as file:
+                payload = json.load(file)
+            os.utime(entry_path)
+            return payload
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, payload):
+        if key is None:
+            return
+        entry_path = self._entry_path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{entry_path}.{os.getpid()}.tmp"
+            # json.dumps uses the C encoder; json.dump to a file does not
+            serialized = json.dumps(payload, separators=(',', ':'))
+            with open(temp_path, 'w') as file:
+                file.write(serialized)
+            os.replace(temp_path, entry_path)
+            evict_lru(self.cache_dir, self.max_bytes, AGGREGATE_SUFFIX)
+        except OSError as e:
+            print(f"Error writing cache entry {entry_path}: {e}")
+
+@contextlib.contextmanager
+def file_lock(lock_path):
+    """Hold an exclusive advisory lock on lock_path for the duration of the with block."""
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a') as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+def try_lock(file, exclusive=True):
+    """Take an advisory lock on an open file without waiting; False if another holder has it."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(file.fileno(), (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+def directory_size(path):
+    total_size = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file():
+                total_size += entry.stat().st_size
+    return total_size
+
+class ExtractionCache:
+    """Local copies of the tarball members a run needs, keyed by archive path, size, mtime and member prefix.
+
+    Each entry is a directory holding one date's members in archive order plus a marker listing
+    them. The marker's mtime is the entry's last use, and whole entries are evicted least recently
+    used first once the cache exceeds max_bytes.
+
+    Every entry has two lock files next to the cache. The extract lock is held exclusively while
+    an entry is checked or written, so only runs that want the same members wait for each other.
+    The use lock is held shared for as long as this object lives, from the moment an entry is
+    handed out; eviction only deletes entries whose locks it can take without waiting, so an entry
+    another run is reading is never removed.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_EXTRACT_DIR, max_bytes=DEFAULT_EXTRACT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock_dir = cache_dir.rstrip(os.sep) + '.locks'
+        # entry key -> open use-lock file, held shared until close()
+        self.held = {}
+        self.held_lock = threading.Lock()
+
+    def entry_key(self, archive_path, member_prefix):
+        fingerprint = file_fingerprint(archive_path)
+        if fingerprint is None:
+            return None
+        return hashlib.sha1(json.dumps([*fingerprint, member_prefix]).encode()).hexdigest()
+
+    def lock_paths(self, key):
+        """(extract lock, use lock) paths of an entry."""
+        return os.path.join(self.lock_dir, key + '.extract'), os.path.join(self.lock_dir, key + '.use')
+
+    def cached_members(self, entry_dir):
+        """Paths of a complete entry's members, or None if the entry is missing or partial."""
+        marker_path = os.path.join(entry_dir, EXTRACT_MARKER)
+        try:
+            with open(marker_path, 'r') as file:
+                member_names = json.load(file)
+        except (OSError, ValueError):
+            return None
+        member_paths = [os.path.join(entry_dir, name) for name in member_names]
+        if not all(os.path.exists(path) for path in member_paths):
+            return None
+        os.utime(marker_path)
+        return member_paths
+
+    def hold(self, key, use_path):
+        """Keep a shared use lock on the entry until close(); taken while its extract lock is held."""
+        with self.held_lock:
+            if key in self.held:
+                return
+            use_file = open(use_path, 'a')
+            if fcntl is not None:
+                # Only blocks while an evictor that already holds the extract lock is finishing
+                fcntl.flock(use_file.fileno(), fcntl.LOCK_SH)
+            self.held[key] = use_file
+
+    def close(self):
+        """Release the use locks, letting other runs evict the entries this one read."""
+        with self.held_lock:
+            for use_file in self.held.values():
+                use_file.close()
+            self.held = {}
+
+    def extract(self, archive_path, member_prefix):
+        """Return local paths of the archive's members whose file name starts with member_prefix.
+
+        Only those members are written; the tarball is streamed once and never extracted whole.
+        Returns None if the archive cannot be read, so the caller can fall back to streaming it.
+        """
+        key = self.entry_key(archive_path, member_prefix)
+        if key is None:
+            return None
+        entry_dir = os.path.join(self.cache_dir, key)
+        extract_path, use_path = self.lock_paths(key)
+        extracted = False
+        with file_lock(extract_path):
+            member_paths = self.cached_members(entry_dir)
+            if member_paths is None:
+                try:
+                    member_names = extract_members(archive_path, entry_dir, member_prefix)
+                    with open(os.path.join(entry_dir, EXTRACT_MARKER), 'w') as file:
+                        file.write(json.dumps(member_names))
+                except (OSError, EOFError, tarfile.TarError) as e:
+                    print(f"Error extracting {archive_path}: {e}")
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    return None
+                member_paths = [os.path.join(entry_dir, name) for name in member_names]
+                extracted = True
+            self.hold(key, use_path)
+        if extracted:
+            self.evict(keep=key)
+        return member_paths
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits in max_bytes.
+
+        The keep entry and entries another run is extracting or reading are never removed.
+        """
+        entries = []
+        total_size = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.is_dir():
+                        continue
+                    try:
+                        last_used = os.stat(os.path.join(entry.path, EXTRACT_MARKER)).st_mtime
+                    except OSError:
+                        # Left behind by a crashed extraction
+                        last_used = 0
+                    size = directory_size(entry.path)
+                    entries.append((last_used, size, entry.name, entry.path))
+                    total_size += size
+        except FileNotFoundError:
+            return 0
+
+        removed = 0
+        os.makedirs(self.lock_dir, exist_ok=True)
+        for _, size, name, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            if name == keep or name in self.held:
+                continue
+            extract_path, use_path = self.lock_paths(name)
+            # The lock files are left in place: unlinking one could split its holders across two inodes
+            with open(extract_path, 'a') as extract_file, open(use_path, 'a') as use_file:
+                if not (try_lock(extract_file) and try_lock(use_file)):
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+            removed += 1
+        return removed
+
+def extract_members(tar_path, extract_to, member_prefix):
+    """Stream a .tgz and write the regular-file members whose file name starts with member_prefix.
+
+    Members land flat in extract_to, numbered in archive order so equal file names from
+    different folders cannot collide, and keep their archived mtime. Returns their file names.
+    """
+    shutil.rmtree(extract_to, ignore_errors=True)
+    os.makedirs(extract_to)
+    member_names = []
+    with tarfile.open(tar_path, 'r|gz') as tar:
+        for member in tar:
+            base_name = os.path.basename(member.name)
+            if not (member.isfile() and base_name.startswith(member_prefix)):
+                continue
+            member_name = f"{len(member_names):04d}-{base_name}"
+            with open(os.path.join(extract_to, member_name), 'wb') as file:
+                shutil.copyfileobj(tar.extractfile(member), file, 1024 * 1024)
+            os.utime(os.path.join(extract_to, member_name), (time.time(), member.mtime))
+            member_names.append(member_name)
+    return member_names
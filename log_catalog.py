@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import hashlib
+import threading
+from log_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_CATALOG_DIR = os.path.join(DEFAULT_CACHE_DIR, 'catalog')
+CATALOG_SUFFIX = '.catalog.json'
+CATALOG_VERSION = 1
+# Folder names carry the date as YYYYMMDD right after their prefix, e.g. backup-20240120-0100
+DATE_STAMP_LENGTH = 8
+# A directory modified this recently may change again within the same mtime tick, so it is re-listed next time
+RACY_MTIME_NS = 2 * 1000 * 1000 * 1000
+
+def list_directory(path):
+    """Return (mtime_ns, [(name, size, is_dir)]) for a directory using a single scandir pass."""
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+                size = 0 if is_dir else entry.stat().st_size
+            except OSError:
+                continue
+            entries.append((entry.name, size, is_dir))
+    return os.stat(path).st_mtime_ns, entries
+
+def stable_mtime(mtime_ns):
+    return None if time.time_ns() - mtime_ns < RACY_MTIME_NS else mtime_ns
+
+class LogCatalog:
+    """Persisted listing of a backup directory's dated folders, refreshed from directory mtimes.
+
+    The top level is re-listed only when its mtime changes and a dated folder only when its own
+    mtime does, so a date lookup costs one stat per folder for that date instead of a full walk.
+    """
+
+    def __init__(self, root, prefixes, catalog_dir=DEFAULT_CATALOG_DIR):
+        self.root = root
+        self.prefixes = tuple(prefixes)
+        name = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()
+        self.catalog_path = os.path.join(catalog_dir, name + CATALOG_SUFFIX)
+        self.mtime_ns = None
+        # folder name -> {'mtime_ns': ..., 'files': [[name, size], ...]}, or None until first listed
+        self.folders = {}
+        self.by_date = {}
+        self.changed = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.catalog_path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != CATALOG_VERSION or data.get('prefixes') != list(self.prefixes):
+            return False
+        self.mtime_ns = data['mtime_ns']
+        self.folders = data['folders']
+        self.reindex()
+        return True
+
+    def save(self):
+        if not self.changed:
+            return
+        data = {
+            'version': CATALOG_VERSION,
+            'root': os.path.abspath(self.root),
+            'prefixes': list(self.prefixes),
+            'mtime_ns': self.mtime_ns,
+            'folders': self.folders,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.catalog_path), exist_ok=True)
+            temp_path = f"{self.catalog_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w') as file:
+                file.write(json.dumps(data, separators=(',', ':')))
+            os.replace(temp_path, self.catalog_path)
+            self.changed = False
+        except OSError as e:
+            print(f"Error writing catalog {self.catalog_path}: {e}")
+
+    def reindex(self):
+        self.by_date = {}
+        for folder_name in self.folders:
+            for prefix in self.prefixes:
+                if folder_name.startswith(prefix):
+                    date_str = folder_name[len(prefix):len(prefix) + DATE_STAMP_LENGTH]
+                    self.by_date.setdefault((prefix, date_str), []).append(folder_name)
+
+    def refresh(self):
+        """Re-list the top level if it changed since the catalog was written; return False if it is missing."""
+        try:
+            mtime_ns = os.stat(self.root).st_mtime_ns
+        except OSError:
+            if self.folders:
+                self.folders = {}
+                self.by_date = {}
+                self.mtime_ns = None
+                self.changed = True
+            return False
+        if mtime_ns == self.mtime_ns:
+            return True
+        mtime_ns, entries = list_directory(self.root)
+        # Folders already listed keep their contents; new ones are listed on first lookup
+        self.folders = {name: self.folders.get(name) for name, _, is_dir in entries
+                        if is_dir and name.startswith(self.prefixes)}
+        self.mtime_ns = stable_mtime(mtime_ns)
+        self.reindex()
+        self.changed = True
+        return True
+
+    def folder_files(self, folder_name):
+        """[(file name, size)] of a dated folder, re-listed only if its mtime moved."""
+        folder = self.folders.get(folder_name)
+        folder_path = os.path.join(self.root, folder_name)
+        try:
+            mtime_ns = os.stat(folder_path).st_mtime_ns
+        except OSError:
+            return []
+        if folder is None or folder['mtime_ns'] != mtime_ns:
+            try:
+                mtime_ns, entries = list_directory(folder_path)
+            except OSError:
+                return []
+            folder = self.folders[folder_name] = {
+                'mtime_ns': stable_mtime(mtime_ns),
+                'files': [[name, size] for name, size, is_dir in entries if not is_dir],
+            }
+            self.changed = True
+        return [tuple(entry) for entry in folder['files']]
+
+    def lookup(self, prefix, date_str):
+        """Return [(folder path, [(file name, size)])] for the prefix folders dated date_str (YYYYMMDD)."""
+        with self.lock:
+            results = [(os.path.join(self.root, folder_name), self.folder_files(folder_name))
+                       for folder_name in self.by_date.get((prefix, date_str), [])]
+        return results
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def open_catalog(root, prefixes, catalog_dir=DEFAULT_CATALOG_DIR):
+    """Return the process-wide catalog for root, loaded from disk and refreshed against its mtime."""
+    key = (os.path.abspath(root), tuple(prefixes), catalog_dir)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = LogCatalog(root, prefixes, catalog_dir)
+            catalog.load()
+    with catalog.lock:
+        catalog.refresh()
+    return catalog
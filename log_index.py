@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import hashlib
+from log_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_INDEX_DIR = os.path.join(DEFAULT_CACHE_DIR, 'index')
+INDEX_INTERVAL_BYTES = 4 * 1024 * 1024
+INDEX_SUFFIX = '.tsidx'
+INDEX_VERSION = 1
+# Bytes hashed from the top of the file to notice a rotated log that regrew past the old size
+INDEX_HEAD_BYTES = 4096
+
+# Stop bisecting once the candidate range is this small and scan the rest
+SEEK_MIN_GAP = 64 * 1024
+
+def first_time_after(file, offset, line_time, limit=None):
+    """Return (line offset, time) of the first timestamped line starting at or after offset."""
+    if offset > 0:
+        # Sync to the next line boundary; the line straddling offset belongs before it
+        file.seek(offset - 1)
+        file.readline()
+    else:
+        file.seek(0)
+    position = file.tell()
+    while limit is None or position < limit:
+        raw_line = file.readline()
+        if not raw_line:
+            break
+        line_seconds = line_time(raw_line)
+        if line_seconds is not None:
+            return position, line_seconds
+        position += len(raw_line)
+    return None, None
+
+def bisect_time(file, target, line_time, low=0, high=None):
+    """Binary-search a time-ordered binary file for the lines with time >= target.
+
+    Returns (low, high): every line starting before low is earlier than target, and the first
+    timestamped line starting at or after high is not. line_time maps a raw line to a
+    comparable time, or None for lines without a timestamp.
+    """
+    if high is None:
+        high = os.fstat(file.fileno()).st_size
+    while high - low > SEEK_MIN_GAP:
+        middle = (low + high) // 2
+        line_offset, line_seconds = first_time_after(file, middle, line_time, high)
+        if line_offset is None or line_seconds >= target:
+            high = middle
+        else:
+            low = middle
+    return low, high
+
+def read_raw_lines(file, end=None):
+    """Yield raw lines from the file's current position up to the end byte offset."""
+    position = file.tell()
+    for raw_line in file:
+        if end is not None and position >= end:
+            break
+        position += len(raw_line)
+        yield raw_line
+
+def iter_raw_range(file, start=0, end=None):
+    """Yield the raw lines whose first byte falls in the [start, end) byte range."""
+    if start > 0:
+        # Skip the tail of the line that straddles the range start; it belongs to the previous range
+        file.seek(start - 1)
+        file.readline()
+    else:
+        file.seek(0)
+    yield from read_raw_lines(file, end)
+
+class SparseTimeIndex:
+    """(time, byte offset) checkpoints every interval bytes of a time-ordered log, persisted as a sidecar."""
+
+    def __init__(self, log_path, kind, index_dir=DEFAULT_INDEX_DIR, interval=INDEX_INTERVAL_BYTES):
+        self.log_path = log_path
+        self.kind = kind
+        self.interval = interval
+        if index_dir is None:
+            self.index_path = log_path + INDEX_SUFFIX
+        else:
+            name = hashlib.sha1(f"{os.path.abspath(log_path)}:{kind}".encode()).hexdigest()
+            self.index_path = os.path.join(index_dir, name + INDEX_SUFFIX)
+        self.size = 0
+        self.head = None
+        self.entries = []
+
+    def load(self):
+        try:
+            with open(self.index_path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != INDEX_VERSION or data.get('interval') != self.interval or data.get('kind') != self.kind:
+            return False
+        self.size = data['size']
+        self.head = data['head']
+        self.entries = [tuple(entry) for entry in data['entries']]
+        return True
+
+    def save(self):
+        data = {
+            'version': INDEX_VERSION,
+            'kind': self.kind,
+            'interval': self.interval,
+            'path': os.path.abspath(self.log_path),
+            'size': self.size,
+            'head': self.head,
+            'entries': self.entries,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+            temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as file:
+                file.write(json.dumps(data, separators=(',', ':')))
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            print(f"Error writing index {self.index_path}: {e}")
+
+    def update(self, file, line_time):
+        """Sample checkpoints up to the current end of file; return True if the index changed."""
+        size = os.fstat(file.fileno()).st_size
+        file.seek(0)
+        head = hashlib.sha1(file.read(INDEX_HEAD_BYTES)).hexdigest()
+        if size < self.size or (self.head is not None and size >= INDEX_HEAD_BYTES and self.size >= INDEX_HEAD_BYTES and head != self.head):
+            # Truncated or rotated: the old checkpoints describe a different file
+            self.entries = []
+            self.size = 0
+        if size == self.size:
+            return False
+
+        # A grown file only needs checkpoints past the last one
+        offset = self.entries[-1][0] + self.interval if self.entries else 0
+        while offset < size:
+            _, line_key = first_time_after(file, offset, line_time, size)
+            if line_key is not None:
+                self.entries.append((offset, line_key))
+            offset += self.interval
+        self.size = size
+        self.head = head
+        return True
+
+    def byte_range(self, start_key, end_key):
+        """Return (low, high) checkpoints bracketing the lines from start_key up to, not including, end_key."""
+        low, high = 0, self.size
+        position = 0
+        for position, (offset, line_key) in enumerate(self.entries):
+            if line_key >= start_key:
+                break
+            low = offset
+        for offset, line_key in self.entries[position:]:
+            if line_key >= end_key:
+                high = offset
+                break
+        return low, high
+
+def indexed_byte_range(log_path, start_key, end_key, line_time, kind, index_dir=DEFAULT_INDEX_DIR):
+    """Byte range of a time-ordered log holding the lines with start_key <= time < end_key.
+
+    The sparse index narrows the range to whole checkpoints and bisect_time refines each edge.
+    """
+    index = SparseTimeIndex(log_path, kind, index_dir)
+    index.load()
+    with open(log_path, 'rb') as file:
+        if index.update(file, line_time):
+            index.save()
+        low, high = index.byte_range(start_key, end_key)
+        start, _ = bisect_time(file, start_key, line_time, low, high)
+        _, end = bisect_time(file, end_key, line_time, start, high)
+    return start, end
@@ -1,15 +1,121 @@
+import os
 import re
+import csv
+import glob
+import lzma
+import time
+import zlib
 import argparse
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from log_index import indexed_byte_range, iter_raw_range
+from log_reader import is_compressed, open_log, zstandard
+from log_sketches import LatencyHistogram
+
+# Read when no log files, directories or hosts are given on the command line
+DEFAULT_LOG_FILE = r'C:\Users\admin\Downloads\shc.txt'  # Replace with the actual path to your log file
+# Each switch node's SHC log directory for --hosts; {} is the node's hostname
+HOST_LOG_DIRECTORY_TEMPLATE = r'\\{}\shc\logs'
+# Files picked up from a directory: the live log and its rotations, plain or compressed
+LOG_FILE_PATTERN = 'shc*'
+
+# A corrupt or truncated log raises one of these; that file is reported and the others still count
+READ_ERRORS = (OSError, EOFError, RuntimeError, ValueError, lzma.LZMAError, zlib.error) + ((zstandard.ZstdError,) if zstandard else ())
+
+SHC_TIMESTAMP_PATTERN = re.compile(rb'\d{2}.\d{2}.\d{2} \d{2}:\d{2}:\d{2}.\d{9}')
+# Lines may be logged slightly out of order, so seeking widens the window by this much
+SEEK_SLACK_SECONDS = 60
+
+RESPONSE_CODES = ['00', '01', '02', '03', '04', '05', '06', '07', '08', '11', '12', '13', '14', '15', '19', '21', '25', '28', '39', '41', '42', '51']
+
+RESPONSE_DESCRIPTIONS = {
+    '00': 'Approved and completed successfully',
+    '01': 'Refer to card issuer',
+    '02': 'Refer to card issuer, special condition',
+    '03': 'Invalid merchant',
+    '04': 'Pick up card (no fraud)',
+    '05': 'Do not honor',
+    '06': 'Error',
+    '07': 'Pick up card, special condition (fraud account)',
+    '08': 'Honour with signature Approve after signature validation alert ',
+    '11': 'Approved (V.I.P)',
+    '12': 'Invalid transaction',
+    '13': 'Invalid amount or currency conversion field overflow',
+    '14': 'Invalid account number (no such number)',
+    '15': 'No such issuer',
+    '19': 'Re-enter transaction',
+    '21': 'No action taken',
+    '25': 'Unable to locate record in file',
+    '28': 'File temporarily not available for update or inquiry',
+    '39': 'No credit account',
+    '41': 'Lost card, pick up (fraud account)',
+    '42': 'Stolen card, pick up (fraud account)',
+    '51': 'Not sufficient funds'
+}
+
+# Matrix axes: the financial response routes, the listed response codes plus '--' for a line
+# without one, and the minute of the day
+MATRIX_ROUTES = ('m0110', 'm0210', 'm0120', 'm0410')
+MATRIX_CODES = tuple(RESPONSE_CODES) + ('--',)
+ROUTE_INDEX = {route: index for index, route in enumerate(MATRIX_ROUTES)}
+CODE_INDEX = {code: index for index, code in enumerate(MATRIX_CODES)}
+NO_CODE_INDEX = CODE_INDEX['--']
+MINUTES_PER_DAY = 1440
+
+# Lines in the standard layout start with a 27-character "yy.mm.dd HH:MM:SS.nnnnnnnnn" timestamp
+TIMESTAMP_LENGTH = 27
+NANOS_PER_SECOND = 1000000000
+NANOS_PER_MINUTE = 60 * NANOS_PER_SECOND
+
+# Precompiled patterns for the single-pass scan
+ROUTE_MARKER = 'I-SHC-030010'
+TIMESTAMP_PATTERN = re.compile(r'\d{2}.\d{2}.\d{2} \d{2}:\d{2}:\d{2}.\d{9}')
+ROUTE_PATTERN = re.compile(r'I-SHC-030010: Route: (m0110|m0210|m0120|m0410)')
+# Every reversal (m0410) and r<code> token of a line in one findall; the two kinds can never overlap
+RESPONSE_TOKEN_PATTERN = re.compile(r'm0410|r(' + '|'.join(RESPONSE_CODES) + r')')
+
+# ISO 8583 request route -> the response route that answers it
+PAIRED_ROUTES = {'m0100': 'm0110', 'm0200': 'm0210', 'm0400': 'm0410'}
+REQUEST_ROUTES = {response: request for request, response in PAIRED_ROUTES.items()}
+PAIRING_PATTERN = re.compile(r'I-SHC-030010: Route: (' + '|'.join(list(PAIRED_ROUTES) + list(REQUEST_ROUTES)) + r')(?:/r(\w\w))?')
+# The stan=/trace= tokens of a line, as one findall, identify the transaction
+PAIRING_KEY_PATTERN = re.compile(r'\b(?:stan|trace)=\w+')
+# A request with no response this long after it, in log time, is counted as a timeout
+PAIRING_TIMEOUT_SECONDS = 30
+# Requests waiting for their response are capped at this many; the oldest are evicted as timeouts beyond it
+PAIRING_MAX_PENDING = 200000
+LATENCY_PERCENTILES = (50, 95, 99)
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Process transaction log file.')
+    parser.add_argument('logs', nargs='*',
+                        help=f"SHC log files, glob patterns or directories (their '{LOG_FILE_PATTERN}' files) to report on together; "
+                             f"defaults to {DEFAULT_LOG_FILE}.")
+    parser.add_argument('--hosts', default=None,
+                        help=f"Comma-separated switch node hostnames or glob patterns whose log directories "
+                             f"({HOST_LOG_DIRECTORY_TEMPLATE}) are added to the logs.")
+    parser.add_argument('--host-directory', default=HOST_LOG_DIRECTORY_TEMPLATE,
+                        help='Template of a node\'s SHC log directory, with {} for the hostname.')
+    parser.add_argument('-w', '--workers', type=int, default=0,
+                        help='Scan the log files on a pool of N processes (0 = one per CPU, 1 = no pool).')
     parser.add_argument('-d', '--date', default=None,
                         help='Specify date in the format yy.mm.dd.')
     parser.add_argument('-s', '--start_time', default=None,
                         help='Specify start time in HH:MM:SS format.')
     parser.add_argument('-e', '--end_time', default=None,
                         help='Specify end time in HH:MM:SS format.')
+    parser.add_argument('--matrix', action='store_true',
+                        help="Also print transactions by route (m0110/m0210/m0120/m0410) and response code; '--' is no code.")
+    parser.add_argument('--matrix-csv', default=None,
+                        help='Export the route x response code x minute matrix to this CSV file.')
+    parser.add_argument('--latency', action='store_true',
+                        help='Also pair requests (m0100/m0200/m0400) with their responses on route, STAN and trace and report latency percentiles.')
+    parser.add_argument('--pair-timeout', type=int, default=PAIRING_TIMEOUT_SECONDS,
+                        help=f'Seconds a request waits for its response before it counts as a timeout (default {PAIRING_TIMEOUT_SECONDS}).')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time the regex and fixed-offset timestamp decoding on the log instead of reporting.')
     return parser.parse_args()
 
 def get_date():
@@ -31,27 +137,470 @@ def get_time(prompt):
     time = input(prompt)
     return time
 
-def filter_log_file(log_file, date, start_time, end_time):
-    with open(log_file, 'r') as file:
-        lines = file.readlines()
+def shc_time_key(date, time_str):
+    """Seconds since 0001-01-01 for a yy.mm.dd date and HH:MM:SS time."""
+    date_obj = datetime.strptime(date, "%y.%m.%d")
+    time_obj = datetime.strptime(time_str, "%H:%M:%S")
+    return date_obj.toordinal() * 86400 + time_obj.hour * 3600 + time_obj.minute * 60 + time_obj.second
 
-    filtered_lines = []
-    for line in lines:
-        if re.search(r'\b' + re.escape(date) + r'\b', line):
-            timestamp_str = re.search(r'\d{2}.\d{2}.\d{2} \d{2}:\d{2}:\d{2}.\d{9}', line)
-            if timestamp_str:
-                timestamp = timestamp_str.group()
-                current_time = timestamp[9:17]
-                if start_time <= current_time <= end_time and re.search(r'I-SHC-030010: Route: (m0110|m0210|m0120|m0410)', line):
-                    filtered_lines.append(line)
-
-    return filtered_lines
-
-def count_response_code_occurrences(lines, response_code_pattern):
-    count = 0
+def shc_line_time(raw_line):
+    match = SHC_TIMESTAMP_PATTERN.search(raw_line)
+    if match:
+        timestamp = match.group().decode()
+        try:
+            return shc_time_key(f"{timestamp[0:2]}.{timestamp[3:5]}.{timestamp[6:8]}", timestamp[9:17])
+        except ValueError:
+            return None
+    return None
+
+def shc_window_byte_range(log_file, date, start_time, end_time):
+    """Byte range of a time-ordered SHC log that can hold the window, via the shared sparse timestamp index."""
+    try:
+        start_key = shc_time_key(date, start_time) - SEEK_SLACK_SECONDS
+        end_key = shc_time_key(date, end_time) + SEEK_SLACK_SECONDS + 1
+    except ValueError:
+        # Without a parseable window the whole file has to be read
+        return 0, None
+    return indexed_byte_range(log_file, start_key, end_key, shc_line_time, 'shc')
+
+def iter_log_lines(log_file, date, start_time, end_time):
+    """Lazily yield the decoded lines of the SHC log that can fall in the window."""
+    if is_compressed(log_file):
+        # A compressed log cannot seek, so it is decompressed whole on the reader's background thread
+        with open_log(log_file) as file:
+            for raw_line in file:
+                yield raw_line.decode(errors='replace')
+    else:
+        start, end = shc_window_byte_range(log_file, date, start_time, end_time)
+        with open(log_file, 'rb') as file:
+            for raw_line in iter_raw_range(file, start, end):
+                yield raw_line.decode(errors='replace')
+
+class ShcMatrix:
+    """Route x response code x minute-of-day transaction counts in one dense array('I').
+
+    The layout is [route][code][minute], so the minutes of one route/code pair are a contiguous
+    slice and any window total is a sum over it, without going back to the log lines.
+    """
+
+    def __init__(self):
+        self.counts = array('I', [0]) * (len(MATRIX_ROUTES) * len(MATRIX_CODES) * MINUTES_PER_DAY)
+
+    def add(self, route_index, code_index, minute, count=1):
+        self.counts[(route_index * len(MATRIX_CODES) + code_index) * MINUTES_PER_DAY + minute] += count
+
+    def merge(self, other):
+        self.counts = array('I', map(int.__add__, self.counts, other.counts))
+        return self
+
+    def total(self, route=None, code=None, first_minute=0, last_minute=MINUTES_PER_DAY - 1):
+        """Transactions in the minute range, for one route and/or code or summed over all of them."""
+        routes = range(len(MATRIX_ROUTES)) if route is None else [ROUTE_INDEX[route]]
+        codes = range(len(MATRIX_CODES)) if code is None else [CODE_INDEX[code]]
+        total = 0
+        for route_index in routes:
+            for code_index in codes:
+                base = (route_index * len(MATRIX_CODES) + code_index) * MINUTES_PER_DAY
+                total += sum(self.counts[base + first_minute:base + last_minute + 1])
+        return total
+
+    def rows(self):
+        """Yield (minute, route, code, count) for every non-zero cell, minute by minute."""
+        cells = [(route_index, code_index) for route_index in range(len(MATRIX_ROUTES)) for code_index in range(len(MATRIX_CODES))
+                 if self.total(MATRIX_ROUTES[route_index], MATRIX_CODES[code_index])]
+        for minute in range(MINUTES_PER_DAY):
+            for route_index, code_index in cells:
+                count = self.counts[(route_index * len(MATRIX_CODES) + code_index) * MINUTES_PER_DAY + minute]
+                if count:
+                    yield minute, MATRIX_ROUTES[route_index], MATRIX_CODES[code_index], count
+
+class ShcPairing:
+    """Pairs ISO 8583 requests with their responses on route, STAN and trace and records the latency.
+
+    A request waits in a pending table until the response to its route arrives; it is evicted as
+    a timeout once it is older than the timeout in log time, or when the table is full, so memory
+    stays flat over a whole day. Latencies are kept in microseconds per response route and code.
+    Pairings of rotated files merge exactly: responses near the start of a file that found no
+    request are kept aside and matched against the requests still pending at the end of the others.
+    """
+
+    def __init__(self, timeout_ns=PAIRING_TIMEOUT_SECONDS * NANOS_PER_SECOND, max_pending=PAIRING_MAX_PENDING):
+        self.timeout_ns = timeout_ns
+        self.max_pending = max_pending
+        self.pending = OrderedDict()
+        # (request route, tokens) -> (response ns, response route, response code)
+        self.early_responses = OrderedDict()
+        self.latencies = {}
+        self.matched = 0
+        self.timeouts = Counter()
+        self.orphan_responses = 0
+        self.unkeyed = 0
+        self.first_ns = None
+        self.latest_ns = None
+
+    def add(self, line, line_ns):
+        match = PAIRING_PATTERN.search(line)
+        if not match:
+            return
+        tokens = tuple(PAIRING_KEY_PATTERN.findall(line))
+        if not tokens:
+            self.unkeyed += 1
+            return
+        if self.first_ns is None or line_ns < self.first_ns:
+            self.first_ns = line_ns
+        if self.latest_ns is None or line_ns > self.latest_ns:
+            self.latest_ns = line_ns
+        route = match.group(1)
+        request_route = REQUEST_ROUTES.get(route)
+        if request_route is None:
+            key = (route, tokens)
+            if key in self.pending:
+                # A retried request is timed from its last attempt
+                self.pending.move_to_end(key)
+            self.pending[key] = line_ns
+            self.expire()
+            return
+        key = (request_route, tokens)
+        request_ns = self.pending.pop(key, None)
+        if request_ns is not None and line_ns - request_ns > self.timeout_ns:
+            self.timeouts[request_route] += 1
+            request_ns = None
+        if request_ns is not None:
+            self.record(route, match.group(2) or '--', (line_ns - request_ns) // 1000)
+        elif line_ns - self.first_ns <= self.timeout_ns and len(self.early_responses) < self.max_pending:
+            # Its request may still be pending at the end of the previous rotation
+            self.early_responses[key] = (line_ns, route, match.group(2) or '--')
+        else:
+            self.orphan_responses += 1
+
+    def record(self, route, response_code, latency_us, count=1):
+        histogram = self.latencies.get((route, response_code))
+        if histogram is None:
+            histogram = self.latencies[(route, response_code)] = LatencyHistogram()
+        histogram.record(latency_us, count)
+        self.matched += count
+
+    def expire(self):
+        # Pending requests are in arrival order, so the stale ones are at the front
+        cutoff = self.latest_ns - self.timeout_ns
+        pending = self.pending
+        while pending:
+            key, request_ns = next(iter(pending.items()))
+            if request_ns >= cutoff and len(pending) <= self.max_pending:
+                break
+            pending.popitem(last=False)
+            self.timeouts[key[0]] += 1
+
+    def pair_early_responses(self, pending, early_responses):
+        """Pair responses that found no request in their own file with the requests pending in another."""
+        for key, (response_ns, route, response_code) in list(early_responses.items()):
+            request_ns = pending.get(key)
+            if request_ns is None or request_ns > response_ns:
+                continue
+            del pending[key]
+            del early_responses[key]
+            if response_ns - request_ns > self.timeout_ns:
+                self.timeouts[key[0]] += 1
+                self.orphan_responses += 1
+            else:
+                self.record(route, response_code, (response_ns - request_ns) // 1000)
+
+    def merge(self, other):
+        """Fold in the pairing of another file or host, in any order; other is left unchanged.
+
+        Requests still pending at the end of either side are paired with the responses kept aside
+        at the start of the other, as when a transaction straddles a log rotation.
+        """
+        pending = OrderedDict(other.pending)
+        early_responses = OrderedDict(other.early_responses)
+        self.pair_early_responses(self.pending, early_responses)
+        self.pair_early_responses(pending, self.early_responses)
+        self.pending.update(pending)
+        self.early_responses.update(early_responses)
+        for (route, response_code), histogram in other.latencies.items():
+            if (route, response_code) not in self.latencies:
+                # Never share the other pairing's histogram; it may be merged into other totals too
+                self.latencies[(route, response_code)] = LatencyHistogram()
+            self.latencies[(route, response_code)].merge(histogram)
+        self.matched += other.matched
+        self.timeouts.update(other.timeouts)
+        self.orphan_responses += other.orphan_responses
+        self.unkeyed += other.unkeyed
+        for line_ns in (other.first_ns, other.latest_ns):
+            if line_ns is not None:
+                if self.first_ns is None or line_ns < self.first_ns:
+                    self.first_ns = line_ns
+                if self.latest_ns is None or line_ns > self.latest_ns:
+                    self.latest_ns = line_ns
+        return self
+
+    def unanswered(self):
+        """Requests per route still waiting for a response when the scan ended."""
+        return Counter(request_route for request_route, _ in self.pending)
+
+    def unpaired_responses(self):
+        return self.orphan_responses + len(self.early_responses)
+
+class ShcCounts:
+    """Financial-transaction counters for one pass over SHC lines; mergeable across files."""
+
+    def __init__(self, pairing=None):
+        self.total_transactions = 0
+        self.reversals = 0
+        self.response_counts = Counter()
+        self.matrix = ShcMatrix()
+        self.pairing = pairing
+
+    def merge(self, other):
+        self.total_transactions += other.total_transactions
+        self.reversals += other.reversals
+        self.response_counts.update(other.response_counts)
+        self.matrix.merge(other.matrix)
+        if other.pairing is not None:
+            if self.pairing is None:
+                self.pairing = ShcPairing(other.pairing.timeout_ns, other.pairing.max_pending)
+            self.pairing.merge(other.pairing)
+        return self
+
+def clock_seconds(clock):
+    """Seconds of the day for an "HH:MM:SS" string, or None if it is not a valid time in that form."""
+    if len(clock) != 8 or clock[2] != ':' or clock[5] != ':' or not (clock[0:2] + clock[3:5] + clock[6:8]).isdecimal():
+        return None
+    hours, minutes, seconds = int(clock[0:2]), int(clock[3:5]), int(clock[6:8])
+    if hours >= 24 or minutes >= 60 or seconds >= 60:
+        return None
+    return (hours * 60 + minutes) * 60 + seconds
+
+def time_of_day_ns(line):
+    """Nanoseconds of the day from the "yy.mm.dd HH:MM:SS.nnnnnnnnn" timestamp a line starts with, or None."""
+    if len(line) < TIMESTAMP_LENGTH or line[8] != ' ' or not line[18:27].isdecimal():
+        return None
+    seconds = clock_seconds(line[9:17])
+    return None if seconds is None else seconds * NANOS_PER_SECOND + int(line[18:27])
+
+def count_transaction(counts, line, route, minute):
+    counts.total_transactions += 1
+    route_index = ROUTE_INDEX[route]
+    in_day = minute < MINUTES_PER_DAY
+    has_code = False
+    for response_code in RESPONSE_TOKEN_PATTERN.findall(line):
+        if response_code:
+            counts.response_counts[response_code] += 1
+            if in_day:
+                counts.matrix.add(route_index, CODE_INDEX[response_code], minute)
+            has_code = True
+        else:
+            counts.reversals += 1
+    if not has_code and in_day:
+        counts.matrix.add(route_index, NO_CODE_INDEX, minute)
+
+def scan_log_lines(lines, date, start_time, end_time, counts=None, fixed_offsets=True):
+    """Filter lines to the date, time window and financial routes and count them, in one pass with constant memory.
+
+    A line that starts with the date's timestamp has it sliced at fixed offsets and checked against
+    the window as integer nanoseconds of the day; each distinct HH:MM:SS is decoded once and
+    memoised, so most lines cost a slice and a dict lookup. Every other line goes through the regex
+    path, which matches the date anywhere in the line, so both paths count exactly the same lines.
+    """
+    counts = ShcCounts() if counts is None else counts
+    pairing = counts.pairing
+    date_pattern = re.compile(r'\b' + re.escape(date) + r'\b')
+    start_seconds, end_seconds = clock_seconds(start_time), clock_seconds(end_time)
+    use_offsets = (fixed_offsets and start_seconds is not None and end_seconds is not None
+                   and len(date) == 8 and (date[0:2] + date[3:5] + date[6:8]).isdecimal())
+    if use_offsets:
+        window_start_ns = start_seconds * NANOS_PER_SECOND
+        window_end_ns = end_seconds * NANOS_PER_SECOND + NANOS_PER_SECOND - 1
+    # Decided once, on the first route line: a log in another layout never tries the fixed offsets
+    fixed_layout = None if use_offsets else False
+    # HH:MM:SS -> nanosecond the second starts at, or None for a malformed clock; at most a day of entries
+    second_starts = {}
     for line in lines:
-        count += len(re.findall(response_code_pattern, line))
-    return count
+        # Cheap substring tests first; almost every other line is a different message type or day
+        if ROUTE_MARKER not in line or date not in line:
+            continue
+        if fixed_layout is None:
+            fixed_layout = time_of_day_ns(line) is not None
+        if fixed_layout and line.startswith(date) and line[8:9] == ' ' and line[18:27].isdecimal():
+            clock = line[9:17]
+            second_ns = second_starts.get(clock, -1)
+            if second_ns == -1:
+                seconds = clock_seconds(clock)
+                second_ns = second_starts[clock] = None if seconds is None else seconds * NANOS_PER_SECOND
+            if second_ns is not None:
+                # The window covers whole seconds, so the nanoseconds are only added for counted lines
+                if window_start_ns <= second_ns <= window_end_ns:
+                    route_match = ROUTE_PATTERN.search(line)
+                    if route_match or pairing is not None:
+                        line_ns = second_ns + int(line[18:27])
+                        if route_match:
+                            count_transaction(counts, line, route_match.group(1), line_ns // NANOS_PER_MINUTE)
+                        if pairing is not None:
+                            pairing.add(line, line_ns)
+                continue
+        if not date_pattern.search(line):
+            continue
+        timestamp_str = TIMESTAMP_PATTERN.search(line)
+        if timestamp_str:
+            current_time = timestamp_str.group()[9:17]
+            if start_time <= current_time <= end_time:
+                route_match = ROUTE_PATTERN.search(line)
+                if route_match:
+                    count_transaction(counts, line, route_match.group(1), int(current_time[0:2]) * 60 + int(current_time[3:5]))
+                if pairing is not None:
+                    line_ns = time_of_day_ns(timestamp_str.group())
+                    if line_ns is not None:
+                        pairing.add(line, line_ns)
+    return counts
+
+def scan_log_file(log_file, date, start_time, end_time, counts=None):
+    return scan_log_lines(iter_log_lines(log_file, date, start_time, end_time), date, start_time, end_time, counts)
+
+def scan_log_file_counts(log_file, date, start_time, end_time, pair_timeout_ns=None):
+    """Worker entry point: scan one SHC log into fresh ShcCounts; returns (counts, error message or None)."""
+    counts = ShcCounts(ShcPairing(pair_timeout_ns) if pair_timeout_ns else None)
+    try:
+        scan_log_file(log_file, date, start_time, end_time, counts)
+    except READ_ERRORS as e:
+        return ShcCounts(ShcPairing(pair_timeout_ns) if pair_timeout_ns else None), f"Error reading {log_file}: {e}"
+    return counts, None
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def scan_log_files(log_files, date, start_time, end_time, workers=0, pair_timeout_ns=None):
+    """Scan several SHC logs, one file per task on a process pool; returns {file: (counts, error)}.
+
+    The largest files are submitted first, so with enough workers the whole set takes about as
+    long as its largest file.
+    """
+    if len(log_files) == 1 or workers == 1:
+        return {log_file: scan_log_file_counts(log_file, date, start_time, end_time, pair_timeout_ns) for log_file in log_files}
+    with ProcessPoolExecutor(max_workers=workers or None) as executor:
+        futures = {log_file: executor.submit(scan_log_file_counts, log_file, date, start_time, end_time, pair_timeout_ns)
+                   for log_file in sorted(log_files, key=file_size, reverse=True)}
+        return {log_file: futures[log_file].result() for log_file in log_files}
+
+def expand_log_paths(specs):
+    """Expand files, glob patterns and directories into a sorted list of log files without duplicates."""
+    log_files = []
+    for spec in specs:
+        if os.path.isdir(spec):
+            matches = sorted(path for path in glob.glob(os.path.join(spec, LOG_FILE_PATTERN)) if os.path.isfile(path))
+            if not matches:
+                print(f"No {LOG_FILE_PATTERN} files in {spec}")
+        elif any(char in spec for char in '*?['):
+            matches = sorted(path for path in glob.glob(spec) if os.path.isfile(path))
+            if not matches:
+                print(f"No files match {spec}")
+        else:
+            matches = [spec]
+        log_files.extend(path for path in matches if path not in log_files)
+    return log_files
+
+def expand_hosts(host_specs, directory_template=HOST_LOG_DIRECTORY_TEMPLATE):
+    """Expand comma-separated hostnames and glob patterns, matched against the per-node log directories."""
+    prefix, suffix = directory_template.split('{}')
+    hosts = []
+    for spec in host_specs.split(','):
+        spec = spec.strip()
+        if not spec:
+            continue
+        if any(char in spec for char in '*?['):
+            matches = [path[len(prefix):len(path) - len(suffix)] for path in sorted(glob.glob(directory_template.format(spec)))]
+            if not matches:
+                print(f"No log directories match host pattern {spec}")
+        else:
+            matches = [spec]
+        hosts.extend(host for host in matches if host not in hosts)
+    return hosts
+
+def find_log_sources(args):
+    """[(source, log file)] for the logs and hosts on the command line; source is the hostname or 'local'."""
+    sources = []
+    if args.logs or not args.hosts:
+        sources.extend(('local', log_file) for log_file in expand_log_paths(args.logs or [DEFAULT_LOG_FILE]))
+    if args.hosts:
+        for host in expand_hosts(args.hosts, args.host_directory):
+            sources.extend((host, log_file) for log_file in expand_log_paths([args.host_directory.format(host)]))
+    return sources
+
+def print_source_table(sources, results):
+    print("\nSOURCE\t\tFILES\tTRANSACTIONS\tREVERSALS")
+    for source in dict.fromkeys(source for source, _ in sources):
+        source_counts = ShcCounts()
+        log_files = [log_file for other, log_file in sources if other == source]
+        for log_file in log_files:
+            source_counts.merge(results[log_file][0])
+        print(f"{source.ljust(15)}\t{len(log_files)}\t{source_counts.total_transactions}\t\t{source_counts.reversals}")
+
+def benchmark_scan(log_file, date, start_time, end_time):
+    """Time the regex-only scan against the fixed-offset one on the same log and check that they agree."""
+    print("Path\t\tSeconds\tLines/sec\tTransactions")
+    results = {}
+    for name, fixed_offsets in (('regex', False), ('fixed-offset', True)):
+        line_count = 0
+        def counted(lines):
+            nonlocal line_count
+            for line in lines:
+                line_count += 1
+                yield line
+        started = time.perf_counter()
+        counts = scan_log_lines(counted(iter_log_lines(log_file, date, start_time, end_time)), date, start_time, end_time,
+                                fixed_offsets=fixed_offsets)
+        elapsed = time.perf_counter() - started
+        results[name] = (elapsed, counts)
+        print(f"{name.ljust(12)}\t{elapsed:.2f}\t{line_count / elapsed if elapsed > 0 else 0:.0f}\t\t{counts.total_transactions}")
+    (regex_elapsed, regex_counts), (fixed_elapsed, fixed_counts) = results['regex'], results['fixed-offset']
+    agree = ((regex_counts.total_transactions, regex_counts.reversals, regex_counts.response_counts, regex_counts.matrix.counts)
+             == (fixed_counts.total_transactions, fixed_counts.reversals, fixed_counts.response_counts, fixed_counts.matrix.counts))
+    if fixed_elapsed > 0:
+        print(f"Speedup: {regex_elapsed / fixed_elapsed:.2f}x; counts {'agree' if agree else 'DIFFER'}")
+
+def format_latency(latency_us):
+    return f"{latency_us / 1000:.3f}"
+
+def print_latency_report(pairing):
+    print("\n================Request/Response Latency by Route and Response Code (ms)================")
+    print("ROUTE\tRESPONSE\tPAIRED\t\t" + "\t".join(f"p{percent}" for percent in LATENCY_PERCENTILES) + "\tMax")
+    overall = LatencyHistogram()
+    for route, response_code in sorted(pairing.latencies):
+        histogram = pairing.latencies[(route, response_code)]
+        overall.merge(histogram)
+        percentiles = "\t".join(format_latency(histogram.percentile(percent)) for percent in LATENCY_PERCENTILES)
+        print(f"{route}\t{response_code}\t\t{histogram.count}\t\t{percentiles}\t{format_latency(histogram.max)}")
+    if overall.count:
+        percentiles = "\t".join(format_latency(overall.percentile(percent)) for percent in LATENCY_PERCENTILES)
+        print(f"All\t\t\t{overall.count}\t\t{percentiles}\t{format_latency(overall.max)}")
+    unanswered = pairing.unanswered()
+    print(f"\nPaired requests: {pairing.matched}")
+    print(f"\nREQUEST\tTIMEOUTS (>{pairing.timeout_ns // NANOS_PER_SECOND}s)\tWAITING AT END")
+    for request_route in PAIRED_ROUTES:
+        print(f"{request_route}\t{pairing.timeouts[request_route]}\t\t{unanswered[request_route]}")
+    print(f"\nResponses with no pending request: {pairing.unpaired_responses()}")
+    if pairing.unkeyed:
+        print(f"Request/response lines without a STAN or trace: {pairing.unkeyed}")
+
+def print_matrix(matrix):
+    codes = [code for code in MATRIX_CODES if matrix.total(code=code)]
+    print("\nROUTE x RESPONSE\t" + "\t".join(codes) + "\tTOTAL")
+    for route in MATRIX_ROUTES:
+        print(f"{route}\t\t\t" + "\t".join(str(matrix.total(route, code)) for code in codes) + f"\t{matrix.total(route)}")
+
+def write_matrix_csv(matrix, date, csv_path):
+    """Export the non-zero matrix cells, one row per minute, route and response code."""
+    try:
+        with open(csv_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['date', 'minute', 'route', 'response_code', 'count'])
+            for minute, route, code, count in matrix.rows():
+                writer.writerow([date, f"{minute // 60:02d}:{minute % 60:02d}", route, code, count])
+        print(f"\nMatrix written to {csv_path}")
+    except OSError as e:
+        print(f"Error writing matrix {csv_path}: {e}")
 
 def main():
     args = parse_args()
@@ -71,55 +620,50 @@ def main():
     else:
         end_time = args.end_time
 
-    log_file = r'C:\Users\admin\Downloads\shc.txt'  # Replace with the actual path to your log file
+    sources = find_log_sources(args)
+    if not sources:
+        print("No SHC log files to scan.")
+        return
+    log_files = list(dict.fromkeys(log_file for _, log_file in sources))
+    if args.benchmark:
+        benchmark_scan(log_files[0], date, start_time, end_time)
+        return
+
     print(f"Searching for lines for date {date} and time range {start_time} - {end_time}...\n")
 
-    filtered_lines = filter_log_file(log_file, date, start_time, end_time)
+    pair_timeout_ns = args.pair_timeout * NANOS_PER_SECOND if args.latency else None
+    results = scan_log_files(log_files, date, start_time, end_time, args.workers, pair_timeout_ns)
+    counts = ShcCounts(ShcPairing(pair_timeout_ns) if pair_timeout_ns else None)
+    for log_file in log_files:
+        file_counts, error = results[log_file]
+        if error:
+            print(error)
+        counts.merge(file_counts)
+    pairing = counts.pairing
+    if len(log_files) > 1:
+        print_source_table(sources, results)
 
-    if not filtered_lines:
+    if not counts.total_transactions:
         print("No lines found for the specified date and time range.")
     else:
-        response_codes = ['00', '01', '02', '03', '04', '05', '06', '07', '08', '11', '12', '13', '14', '15', '19', '21', '25', '28', '39', '41', '42', '51']
-
-        response_descriptions = {
-            '00': 'Approved and completed successfully',
-            '01': 'Refer to card issuer',
-            '02': 'Refer to card issuer, special condition',
-            '03': 'Invalid merchant',
-            '04': 'Pick up card (no fraud)',
-            '05': 'Do not honor',
-            '06': 'Error',
-            '07': 'Pick up card, special condition (fraud account)',
-            '08': 'Honour with signature Approve after signature validation alert ',
-            '11': 'Approved (V.I.P)',
-            '12': 'Invalid transaction',
-            '13': 'Invalid amount or currency conversion field overflow',
-            '14': 'Invalid account number (no such number)',
-            '15': 'No such issuer',
-            '19': 'Re-enter transaction',
-            '21': 'No action taken',
-            '25': 'Unable to locate record in file',
-            '28': 'File temporarily not available for update or inquiry',
-            '39': 'No credit account',
-            '41': 'Lost card, pick up (fraud account)',
-            '42': 'Stolen card, pick up (fraud account)',
-            '51': 'Not sufficient funds'
-        }
-
-        total_transactions = len(filtered_lines)
+        total_transactions = counts.total_transactions
         print(f"\nTotal Financial Transactions: {total_transactions}")
-
-        # Count reversal transactions
-        reversal_count = count_response_code_occurrences(filtered_lines, r'/m0410|m0410')
-        print(f"Reversal: {reversal_count}")
+        print(f"Reversal: {counts.reversals}")
         
         print("\nRESPONSE\t\tDESC\t\t\t\t\t\t\t\tNO.Of TRX\tPERCENTAGE")
 
-        for code in response_codes:
-            count = count_response_code_occurrences(filtered_lines, fr'r{code}')
+        for code in RESPONSE_CODES:
+            count = counts.response_counts[code]
             if count > 0:
                 percentage = (count / total_transactions) * 100
-                print("{:<10}\t{:<65}\t{:<10}\t{:.2f}%".format(code, response_descriptions[code], count, percentage))
+                print("{:<10}\t{:<65}\t{:<10}\t{:.2f}%".format(code, RESPONSE_DESCRIPTIONS[code], count, percentage))
+
+        if args.matrix:
+            print_matrix(counts.matrix)
+        if args.matrix_csv:
+            write_matrix_csv(counts.matrix, date, args.matrix_csv)
+    if pairing is not None:
+        print_latency_report(pairing)
 
 if __name__ == "__main__":
     main()
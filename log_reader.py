@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+import time
+import queue
+import argparse
+import tempfile
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Leading bytes of each supported compressed format
+MAGIC_NUMBERS = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+CODECS = ('gzip', 'bz2', 'xz', 'zstd')
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst')
+
+# Decompressed bytes per block handed from the background thread to the parser
+READ_BLOCK_BYTES = 4 * 1024 * 1024
+# Blocks buffered ahead of the parser; bounds memory at about READ_AHEAD_BLOCKS * READ_BLOCK_BYTES
+READ_AHEAD_BLOCKS = 4
+QUEUE_POLL_SECONDS = 0.1
+
+# Plain-file prefetch: chunk size and how many chunks may be in flight (2 = double buffering)
+PREFETCH_CHUNK_BYTES = 16 * 1024 * 1024
+PREFETCH_DEPTH = 2
+# Past the end of a byte range only the straddling last line is needed, so reads shrink to this
+PREFETCH_TAIL_BYTES = 64 * 1024
+
+def codec_for_header(head):
+    """Return the codec name for a stream's leading bytes, or None for plain data."""
+    for magic, codec in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return codec
+    return None
+
+def detect_compression(path):
+    """Return the codec name from the file's magic bytes, or None for a plain file."""
+    with open(path, 'rb') as file:
+        return codec_for_header(file.read(6))
+
+def open_decompressed(path, codec):
+    """Open a compressed file as a binary stream of its decompressed bytes."""
+    if codec == 'gzip':
+        return gzip.open(path, 'rb')
+    if codec == 'bz2':
+        return bz2.open(path, 'rb')
+    if codec == 'xz':
+        return lzma.open(path, 'rb')
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+def open_decompressed_stream(stream, codec):
+    """Wrap an open binary stream, such as a tarball member, as a stream of its decompressed bytes."""
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    if codec == 'bz2':
+        return bz2.BZ2File(stream, 'rb')
+    if codec == 'xz':
+        return lzma.LZMAFile(stream, 'rb')
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("a member is zstd-compressed; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+class ReadStats:
+    """Time a reader's consumer spent waiting for data versus parsing it; mergeable across workers."""
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.read_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.elapsed_seconds = 0.0
+
+    def merge(self, other):
+        self.bytes_read += other.bytes_read
+        self.read_seconds += other.read_seconds
+        self.wait_seconds += other.wait_seconds
+        self.elapsed_seconds += other.elapsed_seconds
+        return self
+
+    def summary(self):
+        parse_seconds = max(self.elapsed_seconds - self.wait_seconds, 0.0)
+        waiting = (self.wait_seconds / self.elapsed_seconds) * 100 if self.elapsed_seconds > 0 else 0
+        return (f"Read {self.bytes_read / (1024 * 1024):.1f} MB in {self.read_seconds:.2f}s of background I/O; "
+                f"parser waited {self.wait_seconds:.2f}s for data and parsed for {parse_seconds:.2f}s ({waiting:.0f}% waiting).")
+
+class ReadAheadStream(io.RawIOBase):
+    """Raw stream fed by a background thread that reads a source in large blocks.
+
+    zlib, bz2, lzma and plain file reads all release the GIL, so the next blocks are fetched
+    while the caller parses the current one. The queue is bounded, so a slow parser never lets
+    data pile up. With a limit, reads past limit bytes drop to PREFETCH_TAIL_BYTES, since the
+    caller only needs the rest of its last line.
+    """
+
+    def __init__(self, opener, block_size=READ_BLOCK_BYTES, ahead=READ_AHEAD_BLOCKS, limit=None, stats=None):
+        super().__init__()
+        self.opener = opener
+        self.block_size = block_size
+        self.limit = limit
+        self.stats = stats
+        self.blocks = queue.Queue(maxsize=ahead)
+        self.block = memoryview(b'')
+        self.position = 0
+        self.eof = False
+        self.opened_at = time.perf_counter()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._fill, daemon=True)
+        self.thread.start()
+
+    def _put(self, item):
+        while not self.stopping.is_set():
+            try:
+                self.blocks.put(item, timeout=QUEUE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self):
+        try:
+            with self.opener() as source:
+                offset = 0
+                while True:
+                    size = self.block_size
+                    if self.limit is not None:
+                        size = min(size, self.limit - offset) if offset < self.limit else PREFETCH_TAIL_BYTES
+                    started = time.perf_counter()
+                    block = source.read(size)
+                    if self.stats is not None:
+                        self.stats.read_seconds += time.perf_counter() - started
+                        self.stats.bytes_read += len(block)
+                    offset += len(block)
+                    if not self._put(block) or not block:
+                        return
+        except Exception as e:
+            # Re-raised on the reading side
+            self._put(e)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.position >= len(self.block):
+            if self.eof:
+                return 0
+            if self.stats is not None:
+                started = time.perf_counter()
+                item = self.blocks.get()
+                self.stats.wait_seconds += time.perf_counter() - started
+            else:
+                item = self.blocks.get()
+            if isinstance(item, Exception):
+                self.eof = True
+                raise item
+            if not item:
+                self.eof = True
+                return 0
+            self.block = memoryview(item)
+            self.position = 0
+        count = min(len(buffer), len(self.block) - self.position)
+        buffer[:count] = self.block[self.position:self.position + count]
+        self.position += count
+        return count
+
+    def close(self):
+        if not self.closed:
+            if self.stats is not None:
+                self.stats.elapsed_seconds += time.perf_counter() - self.opened_at
+            self.stopping.set()
+            # Unblock a producer waiting on a full queue
+            while self.thread.is_alive():
+                try:
+                    self.blocks.get(timeout=QUEUE_POLL_SECONDS)
+                except queue.Empty:
+                    pass
+            self.thread.join()
+        super().close()
+
+def open_log(path, read_ahead=True, stats=None):
+    """Open a log for binary line reading, transparently decompressing .gz/.bz2/.xz/.zst content.
+
+    Plain files are returned as ordinary binary files; compressed ones are decompressed on a
+    background thread. Either way the result iterates raw lines and works as a context manager.
+    """
+    codec = detect_compression(path)
+    if codec is None:
+        return open(path, 'rb')
+    if not read_ahead:
+        return open_decompressed(path, codec)
+    return io.BufferedReader(ReadAheadStream(lambda: open_decompressed(path, codec), stats=stats), buffer_size=1024 * 1024)
+
+def open_plain_at(path, offset):
+    file = open(path, 'rb', buffering=0)
+    file.seek(offset)
+    return file
+
+def iter_prefetched_lines(path, start=0, end=None, chunk_size=PREFETCH_CHUNK_BYTES, depth=PREFETCH_DEPTH, stats=None):
+    """Yield the raw lines of a plain file whose first byte falls in [start, end), read ahead on a background thread.
+
+    Same lines as log_index.iter_raw_range, but the next chunk_size bytes are already being
+    fetched while the current ones are parsed, which hides the latency of a network filesystem.
+    """
+    offset = max(start - 1, 0)
+    limit = None if end is None else max(end - offset, 0)
+    stream = ReadAheadStream(lambda: open_plain_at(path, offset), chunk_size, depth, limit, stats)
+    with io.BufferedReader(stream, buffer_size=1024 * 1024) as file:
+        position = offset
+        if start > 0:
+            # Skip the tail of the line that straddles the range start; it belongs to the previous range
+            position += len(file.readline())
+        for raw_line in file:
+            if end is not None and position >= end:
+                break
+            position += len(raw_line)
+            yield raw_line
+
+def is_compressed(path):
+    try:
+        return detect_compression(path) is not None
+    except OSError:
+        return False
+
+def write_compressed(source_path, target_path, codec):
+    if codec == 'zstd':
+        with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+            zstandard.ZstdCompressor().copy_stream(source, target)
+        return
+    openers = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+    with open(source_path, 'rb') as source, openers[codec](target_path, 'wb') as target:
+        while True:
+            block = source.read(READ_BLOCK_BYTES)
+            if not block:
+                break
+            target.write(block)
+
+def time_line_reads(path, read_ahead):
+    lines = 0
+    started = time.perf_counter()
+    with open_log(path, read_ahead) as file:
+        for _ in file:
+            lines += 1
+    return time.perf_counter() - started, lines
+
+def benchmark_codecs(sample_path):
+    """Compress a sample log with every available codec and report line-reading throughput."""
+    size = os.path.getsize(sample_path)
+    megabytes = size / (1024 * 1024)
+    print(f"Sample: {sample_path}, {megabytes:.1f} MB")
+    print("Codec\tCompressed MB\tRatio\tDirect MB/s\tRead-ahead MB/s")
+    elapsed, _ = time_line_reads(sample_path, False)
+    print(f"plain\t{megabytes:.1f}\t\t1.00\t{megabytes / elapsed:.1f}\t\t-")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for codec, suffix in zip(CODECS, COMPRESSED_SUFFIXES):
+            if codec == 'zstd' and zstandard is None:
+                print(f"{codec}\tskipped (zstandard is not installed)")
+                continue
+            compressed_path = os.path.join(temp_dir, os.path.basename(sample_path) + suffix)
+            write_compressed(sample_path, compressed_path, codec)
+            compressed_size = os.path.getsize(compressed_path)
+            direct_elapsed, _ = time_line_reads(compressed_path, False)
+            ahead_elapsed, _ = time_line_reads(compressed_path, True)
+            print(f"{codec}\t{compressed_size / (1024 * 1024):.1f}\t\t{size / compressed_size:.2f}\t"
+                  f"{megabytes / direct_elapsed:.1f}\t\t{megabytes / ahead_elapsed:.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark decompressed line reading of a log for every supported codec.')
+    parser.add_argument('sample', help='Plain-text log file to compress and read back.')
+    args = parser.parse_args()
+    benchmark_codecs(args.sample)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+import math
+import heapq
+import hashlib
+
+# Values below 2**HISTOGRAM_SUB_BUCKET_BITS are counted exactly; above that every power of two
+# is split into 2**(HISTOGRAM_SUB_BUCKET_BITS - 1) buckets, so a reported percentile is within
+# 1 / 2**(HISTOGRAM_SUB_BUCKET_BITS - 1) (0.8%) of the true value.
+HISTOGRAM_SUB_BUCKET_BITS = 8
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of non-negative integers; fixed relative error, mergeable."""
+
+    def __init__(self, sub_bucket_bits=HISTOGRAM_SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.half_count = self.sub_bucket_count >> 1
+        self.counts = {}
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return self.sub_bucket_count + (shift - 1) * self.half_count + (value >> shift) - self.half_count
+
+    def _highest_value(self, index):
+        """Largest value that falls in the bucket, so percentiles never under-report."""
+        if index < self.sub_bucket_count:
+            return index
+        shift = (index - self.sub_bucket_count) // self.half_count + 1
+        sub_bucket = (index - self.sub_bucket_count) % self.half_count + self.half_count
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, value, count=1):
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        # Nearest-rank: the smallest value with at least percent% of the samples at or below it
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+# 2**HYPERLOGLOG_PRECISION one-byte registers (16 KB); the standard error of the estimate is
+# 1.04 / sqrt(2**HYPERLOGLOG_PRECISION), 0.81%, so about 98% of estimates are within 2.5%.
+HYPERLOGLOG_PRECISION = 14
+HASH_BITS = 64
+
+# Space-Saving counters kept per field; any reported count overestimates the true one by at most
+# total / SPACE_SAVING_CAPACITY, and every value more frequent than that is guaranteed to be listed.
+SPACE_SAVING_CAPACITY = 100
+
+def stable_hash(value):
+    """64-bit hash that is the same in every process, unlike hash() on str/bytes."""
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'big')
+
+class HyperLogLog:
+    """Fixed-memory estimate of the number of distinct values; merging takes the register-wise maximum."""
+
+    def __init__(self, precision=HYPERLOGLOG_PRECISION):
+        self.precision = precision
+        self.register_count = 1 << precision
+        self.registers = bytearray(self.register_count)
+        self.relative_error = 1.04 / math.sqrt(self.register_count)
+
+    def add(self, value):
+        hashed = stable_hash(value)
+        index = hashed >> (HASH_BITS - self.precision)
+        remainder = hashed & ((1 << (HASH_BITS - self.precision)) - 1)
+        # Position of the leftmost 1 bit in what is left of the hash
+        rank = HASH_BITS - self.precision - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self):
+        m = self.register_count
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+class ExactDistinct:
+    """HyperLogLog's interface backed by a set: exact, but memory grows with every distinct value."""
+
+    relative_error = 0.0
+
+    def __init__(self):
+        self.values = set()
+
+    def add(self, value):
+        self.values.add(value.encode('utf-8') if isinstance(value, str) else value)
+
+    def merge(self, other):
+        self.values.update(other.values)
+        return self
+
+    def estimate(self):
+        return len(self.values)
+
+class SpaceSaving:
+    """Top-K frequent values in fixed memory (Metwally et al.), mergeable as in Agarwal et al.
+
+    Each tracked value carries an error: its true count lies in [count - error, count].
+
+    The counters sit in a min-heap with one (count, sequence, value) entry per tracked value.
+    An increment only updates the dict, so an entry may hold a stale, lower count; the eviction
+    re-pushes stale entries from the top until the top one is current, which makes it the true
+    minimum. Increments are O(1) and an eviction costs O(log capacity) amortized.
+    """
+
+    def __init__(self, capacity=SPACE_SAVING_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self.heap = []
+        # Breaks count ties by age, so values never need to be comparable
+        self.sequence = 0
+
+    def push(self, value, count):
+        self.sequence += 1
+        heapq.heappush(self.heap, (count, self.sequence, value))
+
+    def smallest(self):
+        """(count, value) of the smallest counter, after bringing the heap top up to date."""
+        heap, counts = self.heap, self.counts
+        while True:
+            count, _, value = heap[0]
+            current = counts[value]
+            if current == count:
+                return count, value
+            self.sequence += 1
+            heapq.heapreplace(heap, (current, self.sequence, value))
+
+    def add(self, value, count=1):
+        self.total += count
+        counts = self.counts
+        if value in counts:
+            counts[value] += count
+        elif len(counts) < self.capacity:
+            counts[value] = count
+            self.errors[value] = 0
+            self.push(value, count)
+        else:
+            # The newcomer inherits the smallest counter, which bounds how much it may overestimate
+            floor, victim = self.smallest()
+            heapq.heappop(self.heap)
+            del counts[victim]
+            del self.errors[victim]
+            counts[value] = floor + count
+            self.errors[value] = floor
+            self.push(value, floor + count)
+
+    def floor(self):
+        """Largest count an untracked value could have."""
+        return self.smallest()[0] if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other):
+        own_floor, other_floor = self.floor(), other.floor()
+        counts, errors = {}, {}
+        for value in self.counts.keys() | other.counts.keys():
+            counts[value] = self.counts.get(value, own_floor) + other.counts.get(value, other_floor)
+            errors[value] = self.errors.get(value, own_floor) + other.errors.get(value, other_floor)
+        kept = sorted(counts, key=lambda value: (-counts[value], value))[:self.capacity]
+        self.counts = {value: counts[value] for value in kept}
+        self.errors = {value: errors[value] for value in kept}
+        self.total += other.total
+        self.heap = [(counts[value], sequence, value) for sequence, value in enumerate(kept, self.sequence + 1)]
+        self.sequence += len(kept)
+        heapq.heapify(self.heap)
+        return self
+
+    def top(self, n=None):
+        """[(value, count, error)] by descending count."""
+        ranked = sorted(self.counts, key=lambda value: (-self.counts[value], value))
+        return [(value, self.counts[value], self.errors[value]) for value in ranked[:n]]
+
+    def max_error(self):
+        return self.total // self.capacity
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+import os
+import csv
+import sys
+import json
+import sqlite3
+import argparse
+import urllib.request
+from datetime import datetime, timedelta
+from log_cache import DEFAULT_CACHE_DIR, file_fingerprint
+
+DEFAULT_STORE_DIR = os.path.join(DEFAULT_CACHE_DIR, 'store')
+PARTITION_TEMPLATE = 'responses-{}.sqlite'
+STORE_VERSION = 1
+INSERT_BATCH_SIZE = 10000
+# ingest_file's result for a source file that is missing or cannot be stat'ed
+SOURCE_MISSING = -1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    size INTEGER,
+    mtime_ns INTEGER,
+    records INTEGER,
+    ingested_at TEXT
+);
+CREATE TABLE IF NOT EXISTS responses (
+    source_id INTEGER,
+    time_ms INTEGER,
+    uuid TEXT,
+    response_code TEXT,
+    response_message TEXT,
+    host_response_code TEXT,
+    actual_response_code TEXT,
+    certificate INTEGER,
+    response_json TEXT
+);
+"""
+# Built after the first bulk load rather than maintained row by row during it
+INDEXES = """
+CREATE INDEX IF NOT EXISTS responses_time ON responses (time_ms);
+CREATE INDEX IF NOT EXISTS responses_code_time ON responses (response_code, time_ms);
+CREATE INDEX IF NOT EXISTS responses_source ON responses (source_id);
+"""
+
+# --group-by name -> (SQL expression, formatter for the group value)
+GROUPINGS = {
+    'response_code': ('response_code', str),
+    'response_message': ('response_message', str),
+    'host_response_code': ('host_response_code', str),
+    'actual_response_code': ('actual_response_code', str),
+    'hour': ('time_ms / 3600000', lambda value: 'untimed' if value is None else f"{value:02d}:00"),
+    'minute': ('time_ms / 60000', lambda value: 'untimed' if value is None else f"{value // 60:02d}:{value % 60:02d}"),
+}
+FILTERS = ('response_code', 'host_response_code', 'actual_response_code', 'uuid')
+
+def time_to_millis(time_str):
+    hours, minutes, seconds = map(int, time_str.split(':'))
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000
+
+class StorePartition:
+    """One date's SQLite database of parsed OUT_MESSAGE response records.
+
+    Only the ingest path opens it writable and creates the schema; queries open it read-only,
+    so a stray statement can never change or recreate the tables.
+    """
+
+    def __init__(self, path, read_only=False):
+        self.path = path
+        if read_only:
+            self.connection = sqlite3.connect(f"file:{urllib.request.pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+        else:
+            self.connection = sqlite3.connect(path)
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {STORE_VERSION}")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def is_current(self, fingerprint):
+        """True if this exact file version (path, size, mtime) is already loaded."""
+        path, size, mtime_ns = fingerprint
+        row = self.connection.execute("SELECT size, mtime_ns FROM sources WHERE path = ?", (path,)).fetchone()
+        return row is not None and tuple(row) == (size, mtime_ns)
+
+    def ingest(self, fingerprint, records):
+        """Replace the rows of one source file with records in a single transaction; return the row count.
+
+        records yields (time_ms, uuid, responseCode, responseMessage, hostResponseCode,
+        actualResponseCode, certificate flag, response JSON) tuples.
+        """
+        path, size, mtime_ns = fingerprint
+        connection = self.connection
+        # Bulk load: a crash only loses this partition's uncommitted source, which is re-ingested next run
+        connection.execute("PRAGMA synchronous = OFF")
+        with connection:
+            row = connection.execute("SELECT id FROM sources WHERE path = ?", (path,)).fetchone()
+            if row is not None:
+                connection.execute("DELETE FROM responses WHERE source_id = ?", (row[0],))
+                connection.execute("DELETE FROM sources WHERE id = ?", (row[0],))
+            source_id = connection.execute(
+                "INSERT INTO sources (path, size, mtime_ns, records, ingested_at) VALUES (?, ?, ?, 0, ?)",
+                (path, size, mtime_ns, datetime.now().isoformat(timespec='seconds'))).lastrowid
+            count = 0
+            batch = []
+            for record in records:
+                batch.append((source_id, *record))
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    connection.executemany("INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                connection.executemany("INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                count += len(batch)
+            connection.execute("UPDATE sources SET records = ? WHERE id = ?", (count, source_id))
+        connection.executescript(INDEXES)
+        return count
+
+    def lost_actual_codes(self):
+        """Rows whose stored JSON carries an actualResponseCode that the actual_response_code column is missing."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM responses WHERE actual_response_code IS NULL AND response_json LIKE '%\"actualResponseCode\":%' "
+            "AND response_json NOT LIKE '%\"actualResponseCode\":null%'").fetchone()[0]
+
+    def count_by(self, group_by, start_ms=None, end_ms=None, filters=None, exclude_certificate=False):
+        expression, _ = GROUPINGS[group_by]
+        conditions, parameters = [], []
+        if start_ms is not None:
+            conditions.append("time_ms BETWEEN ? AND ?")
+            parameters.extend((start_ms, end_ms))
+        for column, value in (filters or {}).items():
+            conditions.append(f"{column} = ?")
+            parameters.append(value)
+        if exclude_certificate:
+            conditions.append("certificate = 0")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.connection.execute(
+            f"SELECT {expression} AS grouping, COUNT(*) FROM responses {where} GROUP BY grouping", parameters).fetchall()
+
+class ResponseStore:
+    """Date-partitioned store: one SQLite file per day, so a day can be re-ingested or dropped on its own."""
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.store_dir = store_dir
+
+    def partition_path(self, date):
+        return os.path.join(self.store_dir, PARTITION_TEMPLATE.format(date))
+
+    def partition(self, date):
+        """The date's partition opened for ingesting, created with its schema if it does not exist yet."""
+        os.makedirs(self.store_dir, exist_ok=True)
+        return StorePartition(self.partition_path(date))
+
+    def reader(self, date):
+        """The date's existing partition opened read-only."""
+        return StorePartition(self.partition_path(date), read_only=True)
+
+    def existing_dates(self, dates):
+        return [date for date in dates if os.path.exists(self.partition_path(date))]
+
+    def ingest_file(self, date, path, records_factory, tag=''):
+        """Load one log file's records unless this version of it is already in the date's partition.
+
+        records_factory is only called when the file needs parsing; tag tells apart several
+        sources read from the same file, such as the member groups of one tarball. Returns the
+        number of rows written, None if the file was already current, or SOURCE_MISSING.
+        """
+        fingerprint = file_fingerprint(path)
+        if fingerprint is None:
+            return SOURCE_MISSING
+        fingerprint = (fingerprint[0] + tag, fingerprint[1], fingerprint[2])
+        with self.partition(date) as partition:
+            if partition.is_current(fingerprint):
+                return None
+            return partition.ingest(fingerprint, records_factory())
+
+def date_range(from_date, to_date):
+    """Every YYYY-MM-DD date from from_date through to_date."""
+    first_day = datetime.strptime(from_date, '%Y-%m-%d').date()
+    last_day = datetime.strptime(to_date, '%Y-%m-%d').date()
+    return [(first_day + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range((last_day - first_day).days + 1)]
+
+def query_counts(store, dates, group_by, start_time=None, end_time=None, filters=None, exclude_certificate=False):
+    """Sum the per-partition GROUP BY counts over the dates; returns [(group, count)] sorted by count."""
+    start_ms = time_to_millis(start_time) if start_time else None
+    end_ms = time_to_millis(end_time) + 999 if end_time else None
+    _, formatter = GROUPINGS[group_by]
+    totals = {}
+    for date in store.existing_dates(dates):
+        with store.reader(date) as partition:
+            for value, count in partition.count_by(group_by, start_ms, end_ms, filters, exclude_certificate):
+                totals[value] = totals.get(value, 0) + count
+    if group_by in ('hour', 'minute'):
+        ordered = sorted(totals.items(), key=lambda item: (item[0] is None, item[0] or 0))
+    else:
+        ordered = sorted(totals.items(), key=lambda item: -item[1])
+    return [(formatter(value), count) for value, count in ordered]
+
+def run_sql(store, dates, sql):
+    """Run one read-only statement against every date partition; returns (column names, rows)."""
+    columns, rows = [], []
+    for date in store.existing_dates(dates):
+        with store.reader(date) as partition:
+            cursor = partition.connection.execute(sql)
+            columns = ['date'] + [description[0] for description in cursor.description or []]
+            rows.extend([date, *row] for row in cursor.fetchall())
+    return columns, rows
+
+def write_rows(columns, rows, output_format):
+    if output_format == 'csv':
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    elif output_format == 'json':
+        print(json.dumps([dict(zip(columns, row)) for row in rows], indent=2))
+    else:
+        print("\t".join(columns))
+        for row in rows:
+            print("\t".join(str(value) for value in row))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Query the store of parsed wso2 OUT_MESSAGE responses.')
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR, help='Directory holding the per-date SQLite partitions.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    query = subparsers.add_parser('query', help='Count responses, grouped and filtered.')
+    query.add_argument('--date', required=True, help='Day to query (YYYY-MM-DD), or the first day with --to-date.')
+    query.add_argument('--to-date', default=None, help='Last day of the range, inclusive.')
+    query.add_argument('--start-time', default=None, help='Only responses from this time of day (HH:MM:SS).')
+    query.add_argument('--end-time', default=None, help='Only responses up to this time of day (HH:MM:SS).')
+    query.add_argument('--group-by', choices=sorted(GROUPINGS), default='response_code')
+    for column in FILTERS:
+        query.add_argument(f"--{column.replace('_', '-')}", dest=column, default=None, help=f'Only rows with this {column}.')
+    query.add_argument('--exclude-certificate', action='store_true', help='Leave out OUT_MESSAGE lines that carry a certificate.')
+    query.add_argument('--sql', default=None,
+                       help="Run this SELECT against each day's partition (table 'responses') instead of a grouped count.")
+    query.add_argument('--format', choices=('table', 'csv', 'json'), default='table')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    store = ResponseStore(args.store_dir)
+    try:
+        dates = date_range(args.date, args.to_date or args.date)
+    except ValueError:
+        print("Invalid date format. Use YYYY-MM-DD.")
+        return 2
+    if bool(args.start_time) != bool(args.end_time):
+        print("Give both --start-time and --end-time.")
+        return 2
+    if not store.existing_dates(dates):
+        print(f"No ingested data for {args.date}{' to ' + args.to_date if args.to_date else ''}; run the analyzer with --ingest first.")
+        return 3
+
+    try:
+        if args.sql:
+            columns, rows = run_sql(store, dates, args.sql)
+        else:
+            filters = {column: getattr(args, column) for column in FILTERS if getattr(args, column) is not None}
+            rows = query_counts(store, dates, args.group_by, args.start_time, args.end_time, filters, args.exclude_certificate)
+            columns = [args.group_by, 'count']
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Query failed: {e}")
+        return 1
+    write_rows(columns, rows, args.format)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
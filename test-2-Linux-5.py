@@ -1,19 +1,110 @@
 #!/usr/bin/env python3
 
 import os
+import io
+import csv
 import json
+import mmap
 import re
+import glob
 import tarfile
-from collections import defaultdict, Counter
+import sys
+import argparse
+import tempfile
+import contextlib
+from array import array
+from collections import defaultdict, Counter, namedtuple, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 import time
 import socket
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timedelta
+from log_cache import DEFAULT_CACHE_DIR, DEFAULT_EXTRACT_DIR, DEFAULT_EXTRACT_MAX_BYTES, AggregateCache, ExtractionCache
+from log_index import DEFAULT_INDEX_DIR, indexed_byte_range, iter_raw_range
+from log_catalog import DEFAULT_CATALOG_DIR, open_catalog
+from log_reader import PREFETCH_CHUNK_BYTES, PREFETCH_DEPTH, ReadStats, codec_for_header, is_compressed, iter_prefetched_lines, open_decompressed_stream, open_log
+from log_sketches import SPACE_SAVING_CAPACITY, ExactDistinct, HyperLogLog, LatencyHistogram, SpaceSaving
+from log_store import DEFAULT_STORE_DIR, SOURCE_MISSING, ResponseStore, date_range
 
 # Define path variables
 LOG_DIRECTORY_TODAY = '/data/wso2/wso2am-3.2.0/repository/logs'
 BACKUP_DIRECTORY_TEMPLATE = '/ist-shared/backup/{}/backup_wso2'
 ARCHIVE_FILE_NAME = 'bkd_archive.tgz'
-EXTRACTED_DIR_NAME = 'extracted'
+INDEX_DIRECTORY = DEFAULT_INDEX_DIR
+CATALOG_DIRECTORY = DEFAULT_CATALOG_DIR
+BACKUP_FOLDER_PREFIXES = ('backup-', 'archive-')
+
+# Set by --extract-archives: archived members are copied into this local cache instead of being
+# streamed, so they can be split across --workers, mmapped by the bytes engine and indexed
+EXTRACTION_CACHE = None
+
+# Lines may be logged slightly out of order, so seeking widens the window by this much
+SEEK_SLACK_SECONDS = 60
+
+# Bump whenever a parser change alters the counts, so cached aggregates are rebuilt
+PARSER_VERSION = 3
+
+# Files larger than this are split into newline-aligned byte ranges for --workers
+CHUNK_SIZE_BYTES = 64 * 1024 * 1024
+
+# Plain logs are read ahead on a background thread in chunks of this size (0 = plain buffered reads),
+# with up to READ_AHEAD_DEPTH chunks in flight; set from --read-ahead-mb/--read-ahead-depth
+READ_AHEAD_BYTES = PREFETCH_CHUNK_BYTES
+READ_AHEAD_DEPTH = PREFETCH_DEPTH
+
+# --latency: an IN_MESSAGE with no OUT_MESSAGE within this much log time is reported as unmatched
+CORRELATION_TIMEOUT_SECONDS = 300
+# INs waiting for their OUT are capped at this many; the oldest are evicted as unmatched beyond it
+CORRELATION_MAX_PENDING = 200000
+LATENCY_PERCENTILES = (50, 95, 99)
+
+# --rollup bucket sizes in seconds, and how many response codes each time-series row names
+ROLLUP_RESOLUTIONS = {'minute': 60, 'second': 1}
+ROLLUP_TOP_CODES = 3
+SECONDS_PER_DAY = 86400
+
+# --distinct counts distinct UUIDs with a HyperLogLog ('approx', fixed 16 KB) or a set ('exact');
+# --top-k reports that many responseMessage/hostResponseCode values from Space-Saving sketches
+DISTINCT_MODES = ('approx', 'exact')
+# With --top-k the exact response table drops the free-text message, which the sketch tracks instead
+SKETCHED_MESSAGE = '*'
+
+# Precompiled patterns for the line parser
+TIMESTAMP_PATTERN = re.compile(r'\[.*?\] \[.*?\] \[([\d\s,-:]+)\]')
+CLOCK_PATTERN = re.compile(r'(\d+):(\d+):(\d+)')
+RESPONSE_PATTERN = re.compile(r'--- Response ---\s*=\s*({.+})(?:,\s*messageType\s*=\s*application/json)?\s*$')
+CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x1F\x7F-\x9F]')
+UUID_PATTERN = re.compile(r'UUID = ([^\s,]+)')
+MILLIS_PATTERN = re.compile(r'(\d+):(\d+):(\d+),(\d+)')
+
+# Bytes-mode equivalents for the mmap engine, which only decodes response payloads
+TIMESTAMP_PATTERN_BYTES = re.compile(rb'\[.*?\] \[.*?\] \[([\d\s,-:]+)\]')
+CLOCK_PATTERN_BYTES = re.compile(rb'(\d+):(\d+):(\d+)')
+UUID_PATTERN_BYTES = re.compile(rb'UUID = ([^\s,]+)')
+MILLIS_PATTERN_BYTES = re.compile(rb'(\d+):(\d+):(\d+),(\d+)')
+RESPONSE_PATTERN_BYTES = re.compile(rb'--- Response ---\s*=\s*({.+})(?:,\s*messageType\s*=\s*application/json)?\s*$')
+CONTROL_BYTES = bytes(range(0x20)) + b'\x7f'
+CONTROL_CHARS_TABLE = dict.fromkeys(list(range(0x20)) + list(range(0x7f, 0xa0)))
+MESSAGE_MARKER = b'_MESSAGE'
+ENGINES = ('text', 'bytes')
+
+# Batch-mode exit codes, for cron and other callers
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_NO_LOGS = 3
+# Some days had no log files or a file could not be read
+EXIT_PARTIAL = 4
+BATCH_FORMATS = ('json', 'csv')
+BATCH_CSV_FIELDS = ['date', 'log_files', 'lines', 'in_messages', 'out_messages', 'certificate_messages',
+                    'successful_transactions', 'failed_transactions', 'cis_declines', 'non_cis_declines',
+                    'dropped_message_percentage', 'read_errors', 'first_log_time', 'last_log_time']
+
+# --follow mode
+FOLLOW_INTERVAL_SECONDS = 10
+FOLLOW_READ_BYTES = 8 * 1024 * 1024
+CLEAR_SCREEN = '\033[H\033[J'
 
 def is_valid_date(date):
     try:
@@ -29,51 +120,103 @@ def is_valid_time(time_str):
     except ValueError:
         return False
 
-def extract_time(log_line):
-    match = re.search(r'\[.*?\] \[.*?\] \[([\d\s,-:]+)\]', log_line)
+def time_to_seconds(time_str):
+    """Convert an HH:MM:SS string to integer seconds of the day."""
+    hours, minutes, seconds = time_str.split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+def extract_seconds(log_line):
+    """Return the log line's time as seconds of the day, or None if it has no timestamp."""
+    # Every timestamped line has the "] [" separator, so skip the regex when it is absent
+    if '] [' not in log_line:
+        return None
+    match = TIMESTAMP_PATTERN.search(log_line)
+    if match:
+        time_only = CLOCK_PATTERN.search(match.group(1))
+        if time_only:
+            hours, minutes, seconds = time_only.groups()
+            hours, minutes, seconds = int(hours), int(minutes), int(seconds)
+            if hours < 24 and minutes < 60 and seconds < 60:
+                return hours * 3600 + minutes * 60 + seconds
+    return None
+
+def extract_seconds_bytes(raw_line):
+    """Bytes-mode extract_seconds for a raw log line."""
+    if b'] [' not in raw_line:
+        return None
+    match = TIMESTAMP_PATTERN_BYTES.search(raw_line)
     if match:
-        timestamp = match.group(1)
-        time_only = re.search(r'(\d+:\d+:\d+)', timestamp)
+        time_only = CLOCK_PATTERN_BYTES.search(match.group(1))
         if time_only:
-            return time_only.group(1)
+            hours, minutes, seconds = time_only.groups()
+            hours, minutes, seconds = int(hours), int(minutes), int(seconds)
+            if hours < 24 and minutes < 60 and seconds < 60:
+                return hours * 3600 + minutes * 60 + seconds
+    return None
+
+def extract_millis(log_line):
+    """Return the log line's time as milliseconds of the day, or None if it has no timestamp."""
+    match = TIMESTAMP_PATTERN.search(log_line)
+    if match:
+        clock = MILLIS_PATTERN.search(match.group(1))
+        if clock:
+            hours, minutes, seconds, millis = (int(value) for value in clock.groups())
+            return ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
     return None
 
-def print_response_fields(response_parts):
-    response_dict = defaultdict(lambda: defaultdict(int))
-    total_counts = Counter()
+def extract_millis_bytes(raw_line):
+    """Bytes-mode extract_millis for a raw log line."""
+    match = TIMESTAMP_PATTERN_BYTES.search(raw_line)
+    if match:
+        clock = MILLIS_PATTERN_BYTES.search(match.group(1))
+        if clock:
+            hours, minutes, seconds, millis = (int(value) for value in clock.groups())
+            return ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
+    return None
 
-    for part in response_parts:
-        response_code = str(part.get('responseCode', 'NA'))
-        response_message = "Msg/Txn Id is Mandatory" if response_code == "4000001" else str(part.get('responseMessage', ''))
-        host_response_code = str(part.get('hostResponseCode', 'NA')).strip()
+def correlation_fields(line):
+    """Return (UUID, milliseconds of the day) of an IN/OUT_MESSAGE line, or None if either is missing."""
+    uuid_match = UUID_PATTERN.search(line)
+    line_millis = extract_millis(line)
+    if uuid_match and line_millis is not None:
+        return uuid_match.group(1), line_millis
+    return None
 
-        # Normalize host response code for response code 0
-        if response_code == "0":
-            if host_response_code not in ["002", "02"]:
-                host_response_code = "00"
-                response_message = "Transactions Authorized"
+def correlation_fields_bytes(raw_line):
+    uuid_match = UUID_PATTERN_BYTES.search(raw_line)
+    line_millis = extract_millis_bytes(raw_line)
+    if uuid_match and line_millis is not None:
+        return uuid_match.group(1).decode('ascii', 'replace'), line_millis
+    return None
 
-        key = (response_message, host_response_code)
-        response_dict[response_code][key] += 1
-        total_counts[response_code] += 1
+def response_key(part):
+    response_code = str(part.get('responseCode', 'NA'))
+    response_message = "Msg/Txn Id is Mandatory" if response_code == "4000001" else str(part.get('responseMessage', ''))
+    host_response_code = str(part.get('hostResponseCode', 'NA')).strip()
 
-    total_out_messages = len(response_parts)
-    total_successful_transactions = total_counts.get("0", 0)
-    total_failure_transactions = total_out_messages - total_successful_transactions
+    # Normalize host response code for response code 0
+    if response_code == "0":
+        if host_response_code not in ["002", "02"]:
+            host_response_code = "00"
+            response_message = "Transactions Authorized"
 
-    cis_decline_count = 0
-    non_cis_decline_count = 0
+    return response_code, response_message, host_response_code
 
-    for response_code, count in total_counts.items():
-        if response_code != "0":
-            for key, sub_count in response_dict[response_code].items():
-                response_message, host_response_code = key
-                if response_code == "91" or (response_code == "8" and host_response_code == "905"):
-                    cis_decline_count += sub_count
-                else:
-                    non_cis_decline_count += sub_count
+def response_code_order(response_code):
+    """Sort key that puts numeric response codes in numeric order and the rest last."""
+    return int(response_code) if response_code.isdigit() else float('inf')
+
+def is_cis_decline(response_code, host_response_code):
+    return response_code == "91" or (response_code == "8" and host_response_code == "905")
 
-    sorted_response_codes = sorted(response_dict.keys(), key=lambda x: (int(x) if x.isdigit() else float('inf')))
+def detailed_response_info(response_counts):
+    """Format the Detailed Response Code rows from a Counter of (responseCode, responseMessage, hostResponseCode)."""
+    response_dict = defaultdict(dict)
+    for (response_code, response_message, host_response_code), count in response_counts.items():
+        response_dict[response_code][(response_message, host_response_code)] = count
+    total_out_messages = sum(response_counts.values())
+
+    sorted_response_codes = sorted(response_dict.keys(), key=response_code_order)
 
     detailed_info = []
     for response_code in sorted_response_codes:
@@ -84,154 +227,1110 @@ def print_response_fields(response_parts):
             percentage = (count / total_out_messages) * 100
             detailed_info.append(f"{response_code.ljust(15)}\t{response_message.ljust(25)}\t{host_response_code.ljust(20)}\t{percentage:.2f}%\t\t{count}")
 
-    return total_out_messages, total_successful_transactions, total_failure_transactions, cis_decline_count, non_cis_decline_count, detailed_info
+    return detailed_info
 
-def print_after_response(line):
-    match = re.search(r'--- Response ---\s*=\s*({.+})(?:,\s*messageType\s*=\s*application/json)?\s*$', line)
+def parse_response_payload(line):
+    """Return (json_data, error_message) for the "--- Response ---" payload of an OUT_MESSAGE line."""
+    match = RESPONSE_PATTERN.search(line)
+    if match:
+        response_part = match.group(1)
+        response_part_cleaned = CONTROL_CHARS_PATTERN.sub('', response_part)
+
+        try:
+            return json.loads(response_part_cleaned), None
+        except json.JSONDecodeError as e:
+            return None, f"Error decoding JSON: {response_part_cleaned}, {e}"
+    return None, None
+
+def parse_response_bytes(raw_line):
+    """Bytes-mode parse_response_payload: only the payload is decoded, and controls are stripped by translate."""
+    match = RESPONSE_PATTERN_BYTES.search(raw_line)
     if match:
         response_part = match.group(1)
-        response_part_cleaned = re.sub(r'[\x00-\x1F\x7F-\x9F]', '', response_part)
+        if response_part.isascii():
+            response_part_cleaned = response_part.translate(None, CONTROL_BYTES).decode('ascii')
+        else:
+            response_part_cleaned = response_part.decode('utf-8', 'replace').translate(CONTROL_CHARS_TABLE)
 
         try:
-            json_data = json.loads(response_part_cleaned)
-            return json_data
+            return json.loads(response_part_cleaned), None
         except json.JSONDecodeError as e:
-            print(f"Error decoding JSON: {response_part_cleaned}, {e}")
-            return None
-
-def process_combined_line(line, response_parts, total_out_messages_with_certificate, unique_response_codes):
-    match_out_message = re.search(r'TXN = OUT_MESSAGE(?:,|$)', line)
-    if match_out_message:
-        uuid_match = re.search(r'UUID = (\S+)', line)
-        if uuid_match:
-            uuid = uuid_match.group(1)
+            return None, f"Error decoding JSON: {response_part_cleaned}, {e}"
+    return None, None
+
+def iter_response_records(lines):
+    """Yield a response-store row for every OUT_MESSAGE line with a parseable response payload."""
+    for line in lines:
+        if 'OUT_MESSAGE' in line and '--- Response ---' in line:
+            json_data, _ = parse_response_payload(line)
+            if json_data is None:
+                continue
+            uuid_match = UUID_PATTERN.search(line)
+            # Nested under additionalResponseData in OUT_MESSAGE payloads; older payloads carry it at the top level
+            additional_data = json_data.get('additionalResponseData')
+            actual_response_code = additional_data.get('actualResponseCode') if isinstance(additional_data, dict) else None
+            if actual_response_code is None:
+                actual_response_code = json_data.get('actualResponseCode')
+            yield (
+                extract_millis(line),
+                uuid_match.group(1) if uuid_match else None,
+                str(json_data.get('responseCode', 'NA')),
+                str(json_data.get('responseMessage', '')),
+                str(json_data.get('hostResponseCode', 'NA')).strip(),
+                None if actual_response_code is None else str(actual_response_code).strip(),
+                int('certificate' in line),
+                json.dumps(json_data, separators=(',', ':')),
+            )
+
+def print_after_response(line):
+    json_data, error_message = parse_response_payload(line)
+    if error_message:
+        print(error_message)
+    return json_data
+
+def scan_log_lines(lines, aggregate, window=None):
+    """Single pass over log lines into a LogAggregate; window is a (start, end) pair in seconds of the day."""
+    in_message_count = 0
+    total_out_messages = 0
+    certificate_count = 0
+    line_count = 0
+    earliest_seconds = None
+    latest_seconds = None
+    window_start, window_end = window if window else (None, None)
+    add_response = aggregate.add_response
+    correlator = aggregate.correlator
+    rollup = aggregate.rollup
+    in_uuids = aggregate.in_uuids
+    out_uuids = aggregate.out_uuids
+
+    for line in lines:
+        log_seconds = extract_seconds(line)
+        if log_seconds is not None:
+            if window and not (window_start <= log_seconds <= window_end):
+                continue
+            # With a window, lines and the time range cover the timestamped lines inside it, however much was read
+            line_count += 1
+            if earliest_seconds is None or log_seconds < earliest_seconds:
+                earliest_seconds = log_seconds
+            if latest_seconds is None or log_seconds > latest_seconds:
+                latest_seconds = log_seconds
+        elif not window:
+            line_count += 1
+
+        if 'IN_MESSAGE' in line:
+            in_message_count += 1
+            if rollup is not None and log_seconds is not None:
+                rollup.add_in(log_seconds)
+            if correlator is not None:
+                fields = correlation_fields(line)
+                if fields:
+                    correlator.add_in(*fields)
+            if in_uuids is not None:
+                uuid_match = UUID_PATTERN.search(line)
+                if uuid_match:
+                    in_uuids.add(uuid_match.group(1))
+        elif 'OUT_MESSAGE' in line and '--- Response ---' in line:
+            total_out_messages += 1
             response_part = print_after_response(line)
+            if correlator is not None:
+                fields = correlation_fields(line)
+                if fields:
+                    correlator.add_out(*fields, response_key(response_part)[0] if response_part is not None else 'NA')
             if response_part is not None:
                 if "certificate" not in line:
-                    response_parts.append(response_part)
+                    # Tally the response now instead of keeping the parsed dict around
+                    add_response(response_part)
+                    if rollup is not None and log_seconds is not None:
+                        rollup.add_response(log_seconds, response_key(response_part))
+                    if out_uuids is not None:
+                        uuid_match = UUID_PATTERN.search(line)
+                        if uuid_match:
+                            out_uuids.add(uuid_match.group(1))
                 else:
-                    total_out_messages_with_certificate += 1
-                    unique_response_codes.add(response_part.get('responseCode', '0'))
+                    certificate_count += 1
+        # A "TXN = OUT_MESSAGE" line without a "--- Response ---" payload carries nothing to count
+
+    aggregate.lines += line_count
+    aggregate.in_messages += in_message_count
+    aggregate.out_messages += total_out_messages
+    aggregate.certificate_messages += certificate_count
+    aggregate.add_time_range(earliest_seconds, latest_seconds)
+    return aggregate
+
+def scan_log_bytes(data, aggregate, window=None, start=0, end=None):
+    """Bytes-mode scan_log_lines over an mmap (or bytes) of a log.
+
+    Only lines holding IN_MESSAGE/OUT_MESSAGE are sliced out, found with find() on the marker;
+    nothing else is decoded. The range covers the lines whose first byte falls in [start, end).
+    """
+    size = len(data)
+    end = size if end is None else min(end, size)
+    find = data.find
+    rfind = data.rfind
+    if start > 0 and data[start - 1] != 0x0A:
+        newline = find(b'\n', start)
+        start = size if newline < 0 else newline + 1
+    if 0 < end < size and data[end - 1] != 0x0A:
+        newline = find(b'\n', end)
+        end = size if newline < 0 else newline + 1
+    if start >= end:
+        return aggregate
 
-def process_log_file(file_path, date, response_parts, total_out_messages_with_certificate, unique_response_codes, start_time=None, end_time=None):
     in_message_count = 0
     total_out_messages = 0
-    earliest_time = None
-    latest_time = None
+    certificate_count = 0
+    window_start, window_end = window if window else (None, None)
+    add_response = aggregate.add_response
+    correlator = aggregate.correlator
+    rollup = aggregate.rollup
+    in_uuids = aggregate.in_uuids
+    out_uuids = aggregate.out_uuids
+    if window:
+        line_count, earliest_seconds, latest_seconds = window_line_stats(data, start, end, window)
+    else:
+        line_count = count_newlines(data, start, end) + (data[end - 1] != 0x0A)
+        earliest_seconds, latest_seconds = edge_line_seconds(data, start, end)
 
-    try:
-        with open(file_path, 'r', errors='replace') as file:
-            for line in file:
-                log_time = extract_time(line)
-                if log_time:
-                    log_datetime = datetime.strptime(f"{date} {log_time}", "%Y-%m-%d %H:%M:%S")
-                    if earliest_time is None or log_datetime < earliest_time:
-                        earliest_time = log_datetime
-                    if latest_time is None or log_datetime > latest_time:
-                        latest_time = log_datetime
-
-                    if start_time and end_time:
-                        start_datetime = datetime.strptime(f"{date} {start_time}", "%Y-%m-%d %H:%M:%S")
-                        end_datetime = datetime.strptime(f"{date} {end_time}", "%Y-%m-%d %H:%M:%S")
-                        if not (start_datetime <= log_datetime <= end_datetime):
-                            continue
-
-                if 'IN_MESSAGE' in line:
-                    in_message_count += 1
-                elif 'OUT_MESSAGE' in line and '--- Response ---' in line:
-                    total_out_messages += 1
-                    response_part = print_after_response(line)
-                    if response_part is not None:
-                        if "certificate" not in line:
-                            response_parts.append(response_part)
-                        else:
-                            total_out_messages_with_certificate += 1
-                            unique_response_codes.add(response_part.get('responseCode', '0'))
-                elif 'TXN = OUT_MESSAGE' in line:
-                    process_combined_line(line, response_parts, total_out_messages_with_certificate, unique_response_codes)
+    position = start
+    while True:
+        marker = find(MESSAGE_MARKER, position, end)
+        if marker < 0:
+            break
+        newline = rfind(b'\n', start, marker)
+        line_start = newline + 1 if newline >= 0 else start
+        newline = find(b'\n', marker, end)
+        position = end if newline < 0 else newline + 1
+        raw_line = data[line_start:position]
+
+        if b'\r' in raw_line:
+            # Text mode splits on a bare carriage return; let the text engine handle the rare line that has one
+            if not window:
+                aggregate.lines -= 1
+            scan_log_lines(decode_log_lines([raw_line]), aggregate, window)
+            continue
+
+        log_seconds = extract_seconds_bytes(raw_line)
+        if log_seconds is not None:
+            if window:
+                if not (window_start <= log_seconds <= window_end):
+                    continue
+            else:
+                if earliest_seconds is None or log_seconds < earliest_seconds:
+                    earliest_seconds = log_seconds
+                if latest_seconds is None or log_seconds > latest_seconds:
+                    latest_seconds = log_seconds
+
+        if b'IN_MESSAGE' in raw_line:
+            in_message_count += 1
+            if rollup is not None and log_seconds is not None:
+                rollup.add_in(log_seconds)
+            if correlator is not None:
+                fields = correlation_fields_bytes(raw_line)
+                if fields:
+                    correlator.add_in(*fields)
+            if in_uuids is not None:
+                uuid_match = UUID_PATTERN_BYTES.search(raw_line)
+                if uuid_match:
+                    in_uuids.add(uuid_match.group(1))
+        elif b'OUT_MESSAGE' in raw_line and b'--- Response ---' in raw_line:
+            total_out_messages += 1
+            response_part, error_message = parse_response_bytes(raw_line)
+            if error_message:
+                print(error_message)
+            if correlator is not None:
+                fields = correlation_fields_bytes(raw_line)
+                if fields:
+                    correlator.add_out(*fields, response_key(response_part)[0] if response_part is not None else 'NA')
+            if response_part is not None:
+                if b"certificate" not in raw_line:
+                    add_response(response_part)
+                    if rollup is not None and log_seconds is not None:
+                        rollup.add_response(log_seconds, response_key(response_part))
+                    if out_uuids is not None:
+                        uuid_match = UUID_PATTERN_BYTES.search(raw_line)
+                        if uuid_match:
+                            out_uuids.add(uuid_match.group(1))
+                else:
+                    certificate_count += 1
+
+    aggregate.lines += line_count
+    aggregate.in_messages += in_message_count
+    aggregate.out_messages += total_out_messages
+    aggregate.certificate_messages += certificate_count
+    aggregate.add_time_range(earliest_seconds, latest_seconds)
+    return aggregate
+
+def count_newlines(data, start, end, block_size=16 * 1024 * 1024):
+    # mmap has no count(), so count block by block
+    return sum(data[offset:min(offset + block_size, end)].count(b'\n') for offset in range(start, end, block_size))
+
+def window_line_stats(data, start, end, window):
+    """(lines, earliest, latest) over the timestamped lines of the range that fall in the window.
+
+    Matches what the text engine reports for a window. Message lines with a carriage return are
+    left out, since the bytes engine hands those to the text engine, which counts them itself.
+    """
+    window_start, window_end = window
+    line_count = 0
+    earliest_seconds = None
+    latest_seconds = None
+    position = start
+    while position < end:
+        newline = data.find(b'\n', position, end)
+        line_end = end if newline < 0 else newline + 1
+        raw_line = data[position:line_end]
+        position = line_end
+        log_seconds = extract_seconds_bytes(raw_line)
+        if log_seconds is None or not (window_start <= log_seconds <= window_end):
+            continue
+        if b'\r' in raw_line and MESSAGE_MARKER in raw_line:
+            continue
+        line_count += 1
+        if earliest_seconds is None or log_seconds < earliest_seconds:
+            earliest_seconds = log_seconds
+        if latest_seconds is None or log_seconds > latest_seconds:
+            latest_seconds = log_seconds
+    return line_count, earliest_seconds, latest_seconds
+
+def edge_line_seconds(data, start, end):
+    """Times of the first and last timestamped lines in the range.
+
+    The bytes engine skips lines without a message marker, so the overall time range is
+    taken from these two lines plus the message lines; for a time-ordered log that is exact.
+    """
+    first_seconds = None
+    position = start
+    while position < end and first_seconds is None:
+        newline = data.find(b'\n', position, end)
+        line_end = end if newline < 0 else newline + 1
+        first_seconds = extract_seconds_bytes(data[position:line_end])
+        position = line_end
+
+    last_seconds = None
+    line_end = end
+    while line_end > start and last_seconds is None:
+        newline = data.rfind(b'\n', start, line_end - 1)
+        line_start = start if newline < 0 else newline + 1
+        last_seconds = extract_seconds_bytes(data[line_start:line_end])
+        line_end = line_start
+    return first_seconds, last_seconds
+
+def scan_log_file_bytes(file_path, aggregate, window=None, start=0, end=None):
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return aggregate
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return scan_log_bytes(data, aggregate, window, start, end)
+
+def seconds_to_datetime(date, seconds):
+    if seconds is None:
+        return None
+    return datetime.strptime(date, '%Y-%m-%d') + timedelta(seconds=seconds)
+
+def raw_line_seconds(raw_line):
+    return extract_seconds(raw_line.decode('utf-8', 'replace'))
+
+def time_window(start_time=None, end_time=None):
+    if start_time and end_time:
+        return time_to_seconds(start_time), time_to_seconds(end_time)
+    return None
+
+class SketchOptions(namedtuple('SketchOptions', ['distinct', 'top_k'])):
+    """Which optional sketches a LogAggregate keeps: a DISTINCT_MODES entry or None, and a top-K size or 0."""
+
+def make_sketch_options(distinct=None, top_k=0):
+    return SketchOptions(distinct, top_k) if distinct or top_k else None
+
+def make_distinct_counter(mode):
+    if mode == 'approx':
+        return HyperLogLog()
+    if mode == 'exact':
+        return ExactDistinct()
+    return None
+
+class LogArchive(namedtuple('LogArchive', ['archive_path', 'member_prefix'])):
+    """The members of a tarball whose file name starts with member_prefix, read as one log source."""
+
+    def __str__(self):
+        return f"{self.archive_path}:{self.member_prefix}*"
+
+def decode_log_lines(raw_lines):
+    for raw_line in raw_lines:
+        line = raw_line.decode('utf-8', 'replace')
+        if '\r' in line:
+            # Split on a bare carriage return the same way text-mode files do
+            yield from io.StringIO(line, newline=None)
+        else:
+            yield line
+
+def iter_archive_lines(archive):
+    """Stream the matching members of a .tgz line by line without extracting them to disk."""
+    # Stream mode reads the tarball front to back once and never seeks
+    with tarfile.open(archive.archive_path, 'r|gz') as tar:
+        for member in tar:
+            if member.isfile() and os.path.basename(member.name).startswith(archive.member_prefix):
+                member_file = tar.extractfile(member)
+                # A rotated member such as wso2carbon-<date>.log.gz is decompressed, as open_log does for an extracted copy
+                codec = codec_for_header(member_file.peek(6)[:6])
+                if codec is None:
+                    yield from decode_log_lines(member_file)
+                else:
+                    with open_decompressed_stream(member_file, codec) as decompressed:
+                        yield from decode_log_lines(decompressed)
+
+def iter_log_lines(file_path, start=0, end=None, stats=None):
+    """Yield the decoded lines whose first byte falls in the [start, end) byte range."""
+    if isinstance(file_path, LogArchive):
+        yield from iter_archive_lines(file_path)
+        return
+    if is_compressed(file_path):
+        # Decompressed on a background thread; a compressed stream cannot seek, so it is read whole
+        with open_log(file_path, stats=stats) as file:
+            yield from decode_log_lines(file)
+        return
+    if READ_AHEAD_BYTES:
+        # The next chunk is fetched from the share while this one is parsed
+        yield from decode_log_lines(iter_prefetched_lines(file_path, start, end, READ_AHEAD_BYTES, READ_AHEAD_DEPTH, stats))
+        return
+
+    with open(file_path, 'rb') as file:
+        yield from decode_log_lines(iter_raw_range(file, start, end))
+
+class MessageCorrelator:
+    """Pairs IN_MESSAGE and OUT_MESSAGE lines by UUID and records the switch latency per response code.
+
+    An IN waits in a pending table until its OUT arrives; it is evicted as unmatched once it is
+    older than the timeout in log time, or when the table is full, so memory stays flat over a
+    whole day. Correlators of consecutive byte ranges merge exactly: OUTs near the start of a range
+    that found no IN are kept aside and matched against the INs still pending in the range before it.
+    """
+
+    def __init__(self, timeout_ms=CORRELATION_TIMEOUT_SECONDS * 1000, max_pending=CORRELATION_MAX_PENDING):
+        self.timeout_ms = timeout_ms
+        self.max_pending = max_pending
+        self.pending = OrderedDict()
+        self.early_outs = OrderedDict()
+        self.latencies = {}
+        self.matched = 0
+        self.expired_ins = 0
+        self.orphan_outs = 0
+        self.first_ms = None
+        self.latest_ms = None
+
+    def observe(self, line_ms):
+        if self.first_ms is None or line_ms < self.first_ms:
+            self.first_ms = line_ms
+        if self.latest_ms is None or line_ms > self.latest_ms:
+            self.latest_ms = line_ms
+
+    def add_in(self, uuid, in_ms):
+        self.observe(in_ms)
+        if uuid in self.pending:
+            # A retried request is timed from its last attempt
+            self.pending.move_to_end(uuid)
+        self.pending[uuid] = in_ms
+        self.expire()
+
+    def add_out(self, uuid, out_ms, response_code):
+        self.observe(out_ms)
+        in_ms = self.pending.pop(uuid, None)
+        if in_ms is not None and out_ms - in_ms > self.timeout_ms:
+            self.expired_ins += 1
+            in_ms = None
+        if in_ms is not None:
+            self.record(response_code, out_ms - in_ms)
+        elif out_ms - self.first_ms <= self.timeout_ms and len(self.early_outs) < self.max_pending:
+            # Its IN may still be pending at the end of the previous range
+            self.early_outs[uuid] = (out_ms, response_code)
+        else:
+            self.orphan_outs += 1
+
+    def record(self, response_code, latency_ms, count=1):
+        histogram = self.latencies.get(response_code)
+        if histogram is None:
+            histogram = self.latencies[response_code] = LatencyHistogram()
+        histogram.record(latency_ms, count)
+        self.matched += count
+
+    def expire(self):
+        # Pending INs are in arrival order, so the stale ones are at the front
+        cutoff = self.latest_ms - self.timeout_ms
+        pending = self.pending
+        while pending:
+            oldest_ms = next(iter(pending.values()))
+            if oldest_ms >= cutoff and len(pending) <= self.max_pending:
+                break
+            pending.popitem(last=False)
+            self.expired_ins += 1
+
+    def merge(self, other):
+        """Fold in the correlator of the range that follows this one."""
+        for uuid, (out_ms, response_code) in other.early_outs.items():
+            in_ms = self.pending.pop(uuid, None)
+            if in_ms is not None and out_ms - in_ms > self.timeout_ms:
+                self.expired_ins += 1
+                in_ms = None
+            if in_ms is not None:
+                self.record(response_code, out_ms - in_ms)
+            elif self.first_ms is None or out_ms - self.first_ms <= self.timeout_ms:
+                self.early_outs[uuid] = (out_ms, response_code)
+            else:
+                self.orphan_outs += 1
+        self.pending.update(other.pending)
+        for response_code, histogram in other.latencies.items():
+            if response_code in self.latencies:
+                self.latencies[response_code].merge(histogram)
+            else:
+                self.latencies[response_code] = histogram
+        self.matched += other.matched
+        self.expired_ins += other.expired_ins
+        self.orphan_outs += other.orphan_outs
+        for line_ms in (other.first_ms, other.latest_ms):
+            if line_ms is not None:
+                self.observe(line_ms)
+        if self.pending:
+            self.expire()
+        return self
+
+    def unmatched_ins(self):
+        return self.expired_ins + len(self.pending)
+
+    def unmatched_outs(self):
+        return self.orphan_outs + len(self.early_outs)
+
+class LogRollup:
+    """Per-minute (or per-second) IN/OUT/decline counters for one day, one flat array per column.
+
+    Bucket i covers seconds [i * bucket_seconds, (i + 1) * bucket_seconds) of the day, so any
+    sub-window is a slice of the arrays and never needs the log again.
+    """
+
+    def __init__(self, bucket_seconds=60):
+        self.bucket_seconds = bucket_seconds
+        self.size = -(-SECONDS_PER_DAY // bucket_seconds)
+        self.in_counts = array('I', [0]) * self.size
+        self.out_counts = array('I', [0]) * self.size
+        self.successes = array('I', [0]) * self.size
+        self.cis_declines = array('I', [0]) * self.size
+        self.non_cis_declines = array('I', [0]) * self.size
+        # response code -> per-bucket counts; a day only sees a handful of codes
+        self.response_codes = {}
+
+    def add_in(self, seconds, count=1):
+        self.in_counts[seconds // self.bucket_seconds] += count
+
+    def add_response(self, seconds, key, count=1):
+        bucket = seconds // self.bucket_seconds
+        response_code, _, host_response_code = key
+        self.out_counts[bucket] += count
+        if response_code == "0":
+            self.successes[bucket] += count
+        elif is_cis_decline(response_code, host_response_code):
+            self.cis_declines[bucket] += count
+        else:
+            self.non_cis_declines[bucket] += count
+        counts = self.response_codes.get(response_code)
+        if counts is None:
+            counts = self.response_codes[response_code] = array('I', [0]) * self.size
+        counts[bucket] += count
+
+    def merge(self, other):
+        for name in ('in_counts', 'out_counts', 'successes', 'cis_declines', 'non_cis_declines'):
+            setattr(self, name, array('I', map(int.__add__, getattr(self, name), getattr(other, name))))
+        for response_code, other_counts in other.response_codes.items():
+            counts = self.response_codes.get(response_code)
+            self.response_codes[response_code] = other_counts if counts is None else array('I', map(int.__add__, counts, other_counts))
+        return self
+
+    def bucket_range(self, window=None):
+        if window is None:
+            return range(self.size)
+        return range(window[0] // self.bucket_seconds, min(window[1] // self.bucket_seconds + 1, self.size))
+
+    def rows(self, window=None):
+        """Yield (bucket start second, IN, OUT, success, CIS decline, non-CIS decline, top codes) for active buckets."""
+        for bucket in self.bucket_range(window):
+            if not (self.in_counts[bucket] or self.out_counts[bucket]):
+                continue
+            code_counts = [(response_code, counts[bucket]) for response_code, counts in self.response_codes.items() if counts[bucket]]
+            top_codes = sorted(code_counts, key=lambda item: (-item[1], response_code_order(item[0])))[:ROLLUP_TOP_CODES]
+            yield (bucket * self.bucket_seconds, self.in_counts[bucket], self.out_counts[bucket], self.successes[bucket],
+                   self.cis_declines[bucket], self.non_cis_declines[bucket], top_codes)
+
+class LogAggregate:
+    """Streaming, mergeable totals for one or more log sources.
+
+    Responses are tallied as they are parsed, so memory grows with the number of distinct
+    (responseCode, responseMessage, hostResponseCode) keys rather than with transactions.
+    """
+
+    def __init__(self, correlate=False, rollup_seconds=None, sketches=None):
+        self.lines = 0
+        self.in_messages = 0
+        self.out_messages = 0
+        self.certificate_messages = 0
+        self.earliest_seconds = None
+        self.latest_seconds = None
+        self.response_counts = Counter()
+        self.successful_transactions = 0
+        self.cis_declines = 0
+        self.non_cis_declines = 0
+        self.messages = []
+        self.read_errors = 0
+        self.read_stats = ReadStats()
+        # Only built for --latency, since pairing costs a UUID and millisecond parse per message line
+        self.correlator = MessageCorrelator() if correlate else None
+        self.rollup = LogRollup(rollup_seconds) if rollup_seconds else None
+        distinct, self.top_k = sketches or (None, 0)
+        self.in_uuids = make_distinct_counter(distinct)
+        self.out_uuids = make_distinct_counter(distinct)
+        self.top_messages = SpaceSaving(max(SPACE_SAVING_CAPACITY, self.top_k)) if self.top_k else None
+        self.top_host_codes = SpaceSaving(max(SPACE_SAVING_CAPACITY, self.top_k)) if self.top_k else None
+
+    def add_response(self, part):
+        key = response_key(part)
+        if self.top_messages is not None:
+            response_code, response_message, host_response_code = key
+            self.top_messages.add(response_message)
+            self.top_host_codes.add(host_response_code)
+            key = (response_code, SKETCHED_MESSAGE, host_response_code)
+        self.add_response_count(key)
+
+    def add_response_count(self, key, count=1):
+        self.response_counts[key] += count
+        response_code, _, host_response_code = key
+        if response_code == "0":
+            self.successful_transactions += count
+        elif is_cis_decline(response_code, host_response_code):
+            self.cis_declines += count
+        else:
+            self.non_cis_declines += count
+
+    def merge(self, other):
+        """Fold another aggregate into this one; merge in file order to keep the report deterministic."""
+        self.lines += other.lines
+        self.in_messages += other.in_messages
+        self.out_messages += other.out_messages
+        self.certificate_messages += other.certificate_messages
+        self.add_time_range(other.earliest_seconds, other.latest_seconds)
+        self.response_counts.update(other.response_counts)
+        self.successful_transactions += other.successful_transactions
+        self.cis_declines += other.cis_declines
+        self.non_cis_declines += other.non_cis_declines
+        self.messages.extend(other.messages)
+        self.read_errors += other.read_errors
+        self.read_stats.merge(other.read_stats)
+        if self.correlator is not None and other.correlator is not None:
+            self.correlator.merge(other.correlator)
+        if self.rollup is not None and other.rollup is not None:
+            self.rollup.merge(other.rollup)
+        for name in ('in_uuids', 'out_uuids', 'top_messages', 'top_host_codes'):
+            sketch, other_sketch = getattr(self, name), getattr(other, name)
+            if sketch is not None and other_sketch is not None:
+                sketch.merge(other_sketch)
+        return self
+
+    def add_time_range(self, earliest_seconds, latest_seconds):
+        if earliest_seconds is not None and (self.earliest_seconds is None or earliest_seconds < self.earliest_seconds):
+            self.earliest_seconds = earliest_seconds
+        if latest_seconds is not None and (self.latest_seconds is None or latest_seconds > self.latest_seconds):
+            self.latest_seconds = latest_seconds
+
+class LogSummary:
+    """Per-second totals for a whole log source, so any time window can be answered without re-parsing."""
+
+    # Bucket id for lines that carry no timestamp; they pass every time window
+    UNTIMED = -1
+
+    def __init__(self):
+        self.lines = 0
+        self.earliest_seconds = None
+        self.latest_seconds = None
+        self.keys = []
+        self.key_index = {}
+        # bucket id -> [in, out, certificate, {key index: [count, first line]}, lines]
+        self.buckets = {}
+        # [bucket id, line number, text] for diagnostics printed while parsing
+        self.messages = []
+        self.read_errors = 0
+
+    def bucket(self, bucket_id):
+        bucket = self.buckets.get(bucket_id)
+        if bucket is None:
+            bucket = self.buckets[bucket_id] = [0, 0, 0, {}, 0]
+        return bucket
+
+    def add_response(self, bucket, key, line_number, count=1):
+        index = self.key_index.get(key)
+        if index is None:
+            index = self.key_index[key] = len(self.keys)
+            self.keys.append(key)
+        entry = bucket[3].get(index)
+        if entry is None:
+            bucket[3][index] = [count, line_number]
+        else:
+            entry[0] += count
+
+    def merge(self, other):
+        """Append a summary of the byte range that follows this one."""
+        offset = self.lines
+        self.lines += other.lines
+        if other.earliest_seconds is not None and (self.earliest_seconds is None or other.earliest_seconds < self.earliest_seconds):
+            self.earliest_seconds = other.earliest_seconds
+        if other.latest_seconds is not None and (self.latest_seconds is None or other.latest_seconds > self.latest_seconds):
+            self.latest_seconds = other.latest_seconds
+        for bucket_id, other_bucket in other.buckets.items():
+            bucket = self.bucket(bucket_id)
+            bucket[0] += other_bucket[0]
+            bucket[1] += other_bucket[1]
+            bucket[2] += other_bucket[2]
+            for other_index, (count, first_line) in other_bucket[3].items():
+                self.add_response(bucket, other.keys[other_index], first_line + offset, count)
+            bucket[4] += other_bucket[4]
+        self.messages.extend([bucket_id, line_number + offset, text] for bucket_id, line_number, text in other.messages)
+        self.read_errors += other.read_errors
+        return self
+
+    def to_aggregate(self, window=None):
+        """Project the buckets that fall in the (start, end) seconds window onto a LogAggregate."""
+        aggregate = LogAggregate()
+        aggregate.lines = self.lines
+        aggregate.read_errors = self.read_errors
+        aggregate.earliest_seconds = self.earliest_seconds
+        aggregate.latest_seconds = self.latest_seconds
+
+        def in_window(bucket_id):
+            return bucket_id == self.UNTIMED or window is None or window[0] <= bucket_id <= window[1]
+
+        if window is not None:
+            # Same as a windowed scan: only the timestamped lines inside the window
+            seconds = [bucket_id for bucket_id, bucket in self.buckets.items()
+                       if bucket_id != self.UNTIMED and bucket[4] and in_window(bucket_id)]
+            aggregate.lines = sum(self.buckets[bucket_id][4] for bucket_id in seconds)
+            aggregate.earliest_seconds = min(seconds, default=None)
+            aggregate.latest_seconds = max(seconds, default=None)
+
+        counts = {}
+        first_lines = {}
+        for bucket_id, bucket in self.buckets.items():
+            if not in_window(bucket_id):
+                continue
+            aggregate.in_messages += bucket[0]
+            aggregate.out_messages += bucket[1]
+            aggregate.certificate_messages += bucket[2]
+            for index, (count, first_line) in bucket[3].items():
+                counts[index] = counts.get(index, 0) + count
+                if index not in first_lines or first_line < first_lines[index]:
+                    first_lines[index] = first_line
+
+        # Keep first-appearance order so the report breaks ties exactly like a direct scan
+        for index in sorted(counts, key=first_lines.get):
+            aggregate.add_response_count(self.keys[index], counts[index])
+        for bucket_id, line_number, text in sorted(self.messages, key=lambda message: message[1]):
+            if in_window(bucket_id):
+                aggregate.messages.append(text + '\n')
+        return aggregate
+
+    def to_rollup(self, bucket_seconds):
+        """Re-bucket the per-second totals into a LogRollup."""
+        rollup = LogRollup(bucket_seconds)
+        for bucket_id, bucket in self.buckets.items():
+            if bucket_id == self.UNTIMED:
+                continue
+            if bucket[0]:
+                rollup.add_in(bucket_id, bucket[0])
+            for index, (count, _) in bucket[3].items():
+                rollup.add_response(bucket_id, self.keys[index], count)
+        return rollup
+
+    def to_dict(self):
+        return {
+            'lines': self.lines,
+            'earliest_seconds': self.earliest_seconds,
+            'latest_seconds': self.latest_seconds,
+            'keys': self.keys,
+            'buckets': [[bucket_id, bucket[0], bucket[1], bucket[2], [[index, count, first_line] for index, (count, first_line) in bucket[3].items()],
+                         bucket[4]]
+                        for bucket_id, bucket in self.buckets.items()],
+            'messages': self.messages,
+            'read_errors': self.read_errors,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls()
+        summary.lines = data['lines']
+        summary.earliest_seconds = data['earliest_seconds']
+        summary.latest_seconds = data['latest_seconds']
+        summary.keys = [tuple(key) for key in data['keys']]
+        summary.key_index = {key: index for index, key in enumerate(summary.keys)}
+        for bucket_id, in_count, out_count, certificate_count, responses, line_count in data['buckets']:
+            summary.buckets[bucket_id] = [in_count, out_count, certificate_count,
+                                          {index: [count, first_line] for index, count, first_line in responses},
+                                          line_count]
+        summary.messages = data['messages']
+        summary.read_errors = data.get('read_errors', 0)
+        return summary
+
+def scan_log_buckets(lines):
+    """Single unwindowed pass that fills a LogSummary with per-second buckets."""
+    summary = LogSummary()
+    earliest_seconds = None
+    latest_seconds = None
+    line_number = 0
+
+    for line in lines:
+        line_number += 1
+        log_seconds = extract_seconds(line)
+        if log_seconds is None:
+            bucket_id = LogSummary.UNTIMED
+        else:
+            bucket_id = log_seconds
+            summary.bucket(bucket_id)[4] += 1
+            if earliest_seconds is None or log_seconds < earliest_seconds:
+                earliest_seconds = log_seconds
+            if latest_seconds is None or log_seconds > latest_seconds:
+                latest_seconds = log_seconds
+
+        if 'IN_MESSAGE' in line:
+            summary.bucket(bucket_id)[0] += 1
+        elif 'OUT_MESSAGE' in line and '--- Response ---' in line:
+            bucket = summary.bucket(bucket_id)
+            bucket[1] += 1
+            response_part, error_message = parse_response_payload(line)
+            if error_message:
+                summary.messages.append([bucket_id, line_number, error_message])
+            if response_part is not None:
+                if "certificate" not in line:
+                    summary.add_response(bucket, response_key(response_part), line_number)
+                else:
+                    bucket[2] += 1
+
+    summary.lines = line_number
+    summary.earliest_seconds = earliest_seconds
+    summary.latest_seconds = latest_seconds
+    return summary
+
+def is_stream_source(file_path):
+    """True for sources that can only be read front to back: tarball members and compressed logs."""
+    return isinstance(file_path, LogArchive) or is_compressed(file_path)
+
+def scan_log_source(file_path, aggregate, window=None, start=0, end=None, engine='text'):
+    if engine == 'bytes' and not is_stream_source(file_path):
+        return scan_log_file_bytes(file_path, aggregate, window, start, end)
+    # Archive members and compressed logs are decompressed streams, so they always go through the text engine
+    return scan_log_lines(iter_log_lines(file_path, start, end, aggregate.read_stats), aggregate, window)
 
+def process_log_file(file_path, aggregate, start_time=None, end_time=None, engine='text'):
+    """Parse one log source into the streaming LogAggregate."""
+    # Window bounds are computed once per file instead of once per line
+    window = time_window(start_time, end_time)
+
+    try:
+        start, end = 0, None
+        if window and not is_stream_source(file_path):
+            # Jump straight to the window instead of reading the file from the top
+            start, end = window_byte_range(file_path, window)
+        scan_log_source(file_path, aggregate, window, start, end, engine)
     except FileNotFoundError:
         print(f"Error: File not found at path {file_path}")
+        aggregate.read_errors += 1
     except Exception as e:
         print(f"Error reading the file: {e}")
+        aggregate.read_errors += 1
+    return aggregate
+
+def window_byte_range(file_path, window):
+    """Byte range of a time-ordered log that can hold lines in the (start, end) window.
+
+    The file's sparse timestamp index is built on first use and extended as the file grows.
+    """
+    return indexed_byte_range(file_path, window[0] - SEEK_SLACK_SECONDS, window[1] + SEEK_SLACK_SECONDS + 1,
+                              raw_line_seconds, 'wso2', INDEX_DIRECTORY)
 
-    return in_message_count, total_out_messages, earliest_time, latest_time
+def plan_log_chunks(log_files, chunk_size=None, window=None):
+    """Split the log files into newline-aligned (file_path, start, end) byte ranges."""
+    chunk_size = chunk_size or CHUNK_SIZE_BYTES
+    chunks = []
+    for log_file in log_files:
+        if is_stream_source(log_file):
+            # A compressed stream cannot be split, but each one still goes to its own worker
+            chunks.append((log_file, 0, None))
+            continue
+        try:
+            start, stop = 0, os.path.getsize(log_file)
+            if window:
+                start, stop = window_byte_range(log_file, window)
+        except OSError:
+            # Let the worker report the missing file the same way the serial path does
+            chunks.append((log_file, 0, None))
+            continue
+        if start >= stop:
+            chunks.append((log_file, start, stop))
+        while start < stop:
+            end = min(start + chunk_size, stop)
+            chunks.append((log_file, start, end))
+            start = end
+    return chunks
+
+def configure_read_ahead(chunk_bytes, depth):
+    global READ_AHEAD_BYTES, READ_AHEAD_DEPTH
+    READ_AHEAD_BYTES = chunk_bytes
+    READ_AHEAD_DEPTH = depth
+
+def configure_extraction(cache_dir, max_bytes):
+    global EXTRACTION_CACHE
+    if EXTRACTION_CACHE is not None:
+        EXTRACTION_CACHE.close()
+    EXTRACTION_CACHE = ExtractionCache(cache_dir, max_bytes) if cache_dir else None
 
-def extract_tar_file(tar_path, extract_to):
+def make_process_pool(workers):
+    """Process pool whose workers use this process's read-ahead settings, whatever the start method."""
+    return ProcessPoolExecutor(max_workers=workers, initializer=configure_read_ahead, initargs=(READ_AHEAD_BYTES, READ_AHEAD_DEPTH))
+
+def process_log_chunk(chunk, window=None, engine='text', correlate=False, rollup_seconds=None, sketches=None):
+    """Worker entry point: parse one byte range into a LogAggregate."""
+    file_path, start, end = chunk
+    aggregate = LogAggregate(correlate, rollup_seconds, sketches)
+    output = io.StringIO()
+    # Capture per-line diagnostics so the parent can print them in file order
+    with contextlib.redirect_stdout(output):
+        try:
+            scan_log_source(file_path, aggregate, window, start, end, engine)
+        except FileNotFoundError:
+            print(f"Error: File not found at path {file_path}")
+            aggregate.read_errors += 1
+        except Exception as e:
+            print(f"Error reading the file: {e}")
+            aggregate.read_errors += 1
+    if output.getvalue():
+        aggregate.messages.append(output.getvalue())
+    return aggregate
+
+def summarize_log_chunk(chunk):
+    """Worker entry point: bucket one byte range into a LogSummary."""
+    file_path, start, end = chunk
     try:
-        with tarfile.open(tar_path, 'r:gz') as tar:
-            tar.extractall(path=extract_to)
+        return scan_log_buckets(iter_log_lines(file_path, start, end))
+    except FileNotFoundError:
+        summary = LogSummary()
+        summary.messages.append([LogSummary.UNTIMED, 0, f"Error: File not found at path {file_path}"])
+        summary.read_errors += 1
     except Exception as e:
-        print(f"Error extracting tar file {tar_path}: {e}")
-
-def find_log_files_in_archives(archive_dir, date, log_files):
-    for archive_folder in os.listdir(archive_dir):
-        if archive_folder.startswith(f'archive-{date.replace("-", "")}'):
-            folder_path = os.path.join(archive_dir, archive_folder)
-            tar_file_path = os.path.join(folder_path, ARCHIVE_FILE_NAME)
-            if os.path.exists(tar_file_path):
-                extract_to = os.path.join(folder_path, EXTRACTED_DIR_NAME)
-                os.makedirs(extract_to, exist_ok=True)
-                extract_tar_file(tar_file_path, extract_to)
-                for log_file in os.listdir(extract_to):
-                    if log_file.startswith(f'wso2carbon-{date}'):
-                        log_files.append(os.path.join(extract_to, log_file))
-
-def process_log_files(date, original_hostname, start_time=None, end_time=None):
-    if not is_valid_date(date):
-        print("Invalid date entered. Exiting.")
-        return
-    elif datetime.strptime(date, '%Y-%m-%d').date() > datetime.now().date():
-        print("Future date entered. Exiting.")
-        return
+        summary = LogSummary()
+        summary.messages.append([LogSummary.UNTIMED, 0, f"Error reading the file: {e}"])
+        summary.read_errors += 1
+    return summary
 
-    start_time_total = time.time()
-    response_parts = []
-    total_out_messages_with_certificate = 0
-    unique_response_codes = set()
+def process_log_files_cached(log_files, window, workers, cache, rollup_seconds=None, executor=None):
+    summaries = {}
+    cache_keys = {}
+    missing_files = []
+    for log_file in log_files:
+        if isinstance(log_file, LogArchive):
+            cache_keys[log_file] = cache.entry_key(log_file.archive_path, PARSER_VERSION, log_file.member_prefix)
+        else:
+            cache_keys[log_file] = cache.entry_key(log_file, PARSER_VERSION)
+        cached = cache.get(cache_keys[log_file])
+        if cached is not None:
+            summaries[log_file] = LogSummary.from_dict(cached)
+        else:
+            missing_files.append(log_file)
 
-    in_message_count = 0
-    total_out_messages = 0
-    overall_earliest_time = None
-    overall_latest_time = None
+    if missing_files:
+        chunks = plan_log_chunks(missing_files)
+        if executor is not None:
+            chunk_summaries = list(executor.map(summarize_log_chunk, chunks))
+        elif workers:
+            with make_process_pool(workers) as executor:
+                chunk_summaries = list(executor.map(summarize_log_chunk, chunks))
+        else:
+            chunk_summaries = [summarize_log_chunk(chunk) for chunk in chunks]
+        for (log_file, _, _), chunk_summary in zip(chunks, chunk_summaries):
+            if log_file in summaries:
+                summaries[log_file].merge(chunk_summary)
+            else:
+                summaries[log_file] = chunk_summary
+        for log_file in missing_files:
+            # A source with a failed chunk is reported but never cached, so the next run reads it again
+            if cache_keys[log_file] is not None and not summaries[log_file].read_errors:
+                cache.put(cache_keys[log_file], summaries[log_file].to_dict())
+
+    aggregate = LogAggregate(rollup_seconds=rollup_seconds)
+    for log_file in log_files:
+        aggregate.merge(summaries[log_file].to_aggregate(window))
+        if rollup_seconds:
+            # The cached per-second buckets already hold the time series, so no log is re-read
+            aggregate.rollup.merge(summaries[log_file].to_rollup(rollup_seconds))
+    return aggregate
 
+def process_log_files_parallel(log_files, window, workers, engine='text', correlate=False, rollup_seconds=None, sketches=None):
+    chunks = plan_log_chunks(log_files, window=window)
+    aggregate = LogAggregate(correlate, rollup_seconds, sketches)
+    with make_process_pool(workers) as executor:
+        # map() yields results in submission order, so the merge is deterministic
+        for chunk_aggregate in executor.map(partial(process_log_chunk, window=window, engine=engine, correlate=correlate,
+                                                    rollup_seconds=rollup_seconds, sketches=sketches), chunks):
+            aggregate.merge(chunk_aggregate)
+    return aggregate
+
+def find_log_files_in_archives(catalog, date, log_files):
+    for folder_path, files in catalog.lookup('archive-', date.replace("-", "")):
+        if any(file_name == ARCHIVE_FILE_NAME for file_name, _ in files):
+            archive = LogArchive(os.path.join(folder_path, ARCHIVE_FILE_NAME), f'wso2carbon-{date}')
+            extracted = EXTRACTION_CACHE.extract(*archive) if EXTRACTION_CACHE is not None else None
+            if extracted is not None:
+                log_files.extend(extracted)
+            else:
+                # The members are streamed straight out of the tarball when the archive is parsed
+                log_files.append(archive)
+
+def find_log_files(date, original_hostname):
     if datetime.strptime(date, '%Y-%m-%d').date() == datetime.now().date():
-        log_files = [os.path.join(LOG_DIRECTORY_TODAY, 'wso2carbon.log')]
-    else:
-        backup_directories = [
-            BACKUP_DIRECTORY_TEMPLATE.format(original_hostname),
-            BACKUP_DIRECTORY_TEMPLATE.format(get_alternate_hostname(original_hostname))
-        ]
-        date_str = date.replace('-', '')
-        log_files = []
+        return [os.path.join(LOG_DIRECTORY_TODAY, 'wso2carbon.log')]
 
-        # Check backup directories first
-        for backup_directory in backup_directories:
-            if os.path.exists(backup_directory):
-                for backup_folder in os.listdir(backup_directory):
-                    if backup_folder.startswith(f'backup-{date_str}'):
-                        folder_path = os.path.join(backup_directory, backup_folder)
-                        for log_file in os.listdir(folder_path):
-                            if log_file.startswith(f'wso2carbon-{date}'):
-                                log_files.append(os.path.join(folder_path, log_file))
-
-        # If no log files found in backup directories, check archive directories
-        if not log_files:
-            for archive_directory in backup_directories:
-                find_log_files_in_archives(archive_directory, date, log_files)
+    backup_directories = [BACKUP_DIRECTORY_TEMPLATE.format(original_hostname)]
+    try:
+        backup_directories.append(BACKUP_DIRECTORY_TEMPLATE.format(get_alternate_hostname(original_hostname)))
+    except ValueError:
+        # Not one of an 01/02 pair; only this host's own backups exist
+        pass
+    return find_backup_log_files(backup_directories, date)
+
+def find_host_log_files(date, hostname):
+    """One host's own log files; in host-set mode every node is named, so no alternate is added."""
+    if datetime.strptime(date, '%Y-%m-%d').date() == datetime.now().date() and hostname == socket.gethostname():
+        return [os.path.join(LOG_DIRECTORY_TODAY, 'wso2carbon.log')]
+    return find_backup_log_files([BACKUP_DIRECTORY_TEMPLATE.format(hostname)], date)
+
+def expand_hosts(host_specs):
+    """Expand comma-separated hostnames and glob patterns into a host list.
+
+    Patterns such as 'apigw-use1-*' are matched against the per-host backup directories.
+    """
+    prefix, suffix = BACKUP_DIRECTORY_TEMPLATE.split('{}')
+    hosts = []
+    for spec in host_specs.split(','):
+        spec = spec.strip()
+        if not spec:
+            continue
+        if any(char in spec for char in '*?['):
+            matches = [path[len(prefix):len(path) - len(suffix)] for path in sorted(glob.glob(BACKUP_DIRECTORY_TEMPLATE.format(spec)))]
+            if not matches:
+                print(f"No backup directories match host pattern {spec}")
+        else:
+            matches = [spec]
+        hosts.extend(host for host in matches if host not in hosts)
+    return hosts
+
+def find_backup_log_files(backup_directories, date):
+    date_str = date.replace('-', '')
+    log_files = []
+    # The catalogs answer from the persisted listing and only re-list folders whose mtime moved
+    catalogs = [open_catalog(backup_directory, BACKUP_FOLDER_PREFIXES, CATALOG_DIRECTORY) for backup_directory in backup_directories]
+
+    # Check backup directories first
+    for catalog in catalogs:
+        for folder_path, files in catalog.lookup('backup-', date_str):
+            for log_file, _ in files:
+                if log_file.startswith(f'wso2carbon-{date}'):
+                    log_files.append(os.path.join(folder_path, log_file))
 
+    # If no log files found in backup directories, check archive directories
+    if not log_files:
+        for catalog in catalogs:
+            find_log_files_in_archives(catalog, date, log_files)
+
+    for catalog in catalogs:
+        with catalog.lock:
+            catalog.save()
+    return log_files
+
+def process_log_files_serial(log_files, start_time=None, end_time=None, engine='text', correlate=False, rollup_seconds=None,
+                             sketches=None):
+    aggregate = LogAggregate(correlate, rollup_seconds, sketches)
     for log_file in log_files:
-        inc, out, earliest_time, latest_time = process_log_file(log_file, date, response_parts, total_out_messages_with_certificate, unique_response_codes, start_time, end_time)
-        in_message_count += inc
-        total_out_messages += out
-        if earliest_time and (overall_earliest_time is None or earliest_time < overall_earliest_time):
-            overall_earliest_time = earliest_time
-        if latest_time and (overall_latest_time is None or latest_time > overall_latest_time):
-            overall_latest_time = latest_time
+        # Each file gets its own correlator, as in the parallel path: one shared across files would
+        # expire the next file's INs against the previous file's latest time
+        aggregate.merge(process_log_file(log_file, LogAggregate(correlate, rollup_seconds, sketches), start_time, end_time, engine))
+    return aggregate
+
+# --self-check: IN/OUT pairs per generated log, and the line layout they are written in
+SELF_CHECK_PAIRS = 1000
+SELF_CHECK_LINE = "TID: [-1234] [] [2024-01-20 {}]  INFO {{org.apache.synapse.mediators.builtin.LogMediator}} - TXN = {}, UUID = {}{}\n"
+
+def self_check(workers=2):
+    """Check that the serial and --workers paths pair the IN/OUT messages of two overlapping logs alike.
+
+    Each log spans longer than the correlation timeout and the second covers the same hours as the
+    first, as the alternate host's backup does, so a correlator carried from one file to the next
+    would expire most of the second file's INs. Returns one of the EXIT_* codes.
+    """
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        log_files = []
+        for file_number in range(2):
+            log_file = os.path.join(scratch_dir, f'wso2carbon-2024-01-20.log.{file_number}')
+            with open(log_file, 'w') as file:
+                for pair in range(SELF_CHECK_PAIRS):
+                    # One pair a second from 10:00, so each log spans about 17 minutes
+                    in_ms = 36000000 + pair * 1000
+                    uuid = f'{file_number}-{pair}'
+                    for line_ms, message, payload in ((in_ms, 'IN_MESSAGE', ''),
+                                                      (in_ms + 20, 'OUT_MESSAGE', ', --- Response --- = {"responseCode":"0"}')):
+                        clock = f"{str(timedelta(milliseconds=line_ms))[:8].zfill(8)},{line_ms % 1000:03d}"
+                        file.write(SELF_CHECK_LINE.format(clock, message, uuid, payload))
+            log_files.append(log_file)
+        results = {}
+        for name, aggregate in (('serial', process_log_files_serial(log_files, correlate=True)),
+                                ('workers', process_log_files_parallel(log_files, None, workers, correlate=True))):
+            correlator = aggregate.correlator
+            results[name] = (correlator.matched, correlator.unmatched_ins(), correlator.unmatched_outs())
+            print(f"{name}: {correlator.matched} matched, {correlator.unmatched_ins()} unmatched IN, "
+                  f"{correlator.unmatched_outs()} unmatched OUT")
+    expected = (2 * SELF_CHECK_PAIRS, 0, 0)
+    if results['serial'] == results['workers'] == expected:
+        print("Self-check passed.")
+        return EXIT_OK
+    print(f"Self-check FAILED: expected {expected[0]} matched and none unmatched on both paths.")
+    return EXIT_ERROR
+
+def benchmark_log_engines(date, original_hostname, start_time=None, end_time=None):
+    """Time every parsing engine on the same log files and check that their results agree."""
+    log_files = find_log_files(date, original_hostname)
+    total_bytes = sum(os.path.getsize(log_file) for log_file in log_files
+                      if not isinstance(log_file, LogArchive) and os.path.exists(log_file))
+    print(f"Benchmarking {len(log_files)} log file(s), {total_bytes / (1024 * 1024):.1f} MB")
+    print("Engine\tSeconds\tLines/sec\tMB/sec\tMatches text")
+
+    reference = None
+    for engine in ENGINES:
+        output = io.StringIO()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            aggregate = process_log_files_serial(log_files, start_time, end_time, engine)
+        elapsed = time.perf_counter() - started
+        result = (aggregate.in_messages, aggregate.out_messages, aggregate.certificate_messages,
+                  list(aggregate.response_counts.items()), output.getvalue())
+        if reference is None:
+            reference = result
+        lines_per_second = aggregate.lines / elapsed if elapsed > 0 else 0
+        megabytes_per_second = total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0
+        print(f"{engine}\t{elapsed:.2f}\t{lines_per_second:.0f}\t\t{megabytes_per_second:.1f}\t{'yes' if result == reference else 'NO'}")
+
+def print_transaction_report(aggregate, date, start_time=None, end_time=None):
+    in_message_count = aggregate.in_messages
+    total_out_messages_with_certificate = aggregate.certificate_messages
+    overall_earliest_time = seconds_to_datetime(date, aggregate.earliest_seconds)
+    overall_latest_time = seconds_to_datetime(date, aggregate.latest_seconds)
 
     hostname = socket.gethostname()
-    
-    total_out_messages, total_successful_transactions, total_failure_transactions, cis_decline_count, non_cis_decline_count, detailed_info = print_response_fields(response_parts)
+
+    total_successful_transactions = aggregate.successful_transactions
+    cis_decline_count = aggregate.cis_declines
+    non_cis_decline_count = aggregate.non_cis_declines
+    total_out_messages = total_successful_transactions + cis_decline_count + non_cis_decline_count
+    total_failure_transactions = total_out_messages - total_successful_transactions
+    detailed_info = detailed_response_info(aggregate.response_counts)
 
     print("\n=========================Transaction Statistic===============================")
     print(f"Executing on hostname: {hostname}")
@@ -267,11 +1366,510 @@ def process_log_files(date, original_hostname, start_time=None, end_time=None):
         print(info)
     print("==============================================================================")
 
+    if aggregate.correlator is not None:
+        print_latency_report(aggregate.correlator)
+    if aggregate.in_uuids is not None or aggregate.top_messages is not None:
+        print_sketch_report(aggregate)
+
+def format_top_codes(top_codes):
+    return " ".join(f"{response_code}:{count}" for response_code, count in top_codes)
+
+def print_rollup_table(rollup, window=None):
+    print("\n=====================Transaction Time Series==================================")
+    print("Time\t\tIN\tOUT\tSuccess\tSuccess %\tCIS Decline\tNon-CIS Decline\tTop Response Codes")
+    for bucket_start, in_count, out_count, successes, cis_declines, non_cis_declines, top_codes in rollup.rows(window):
+        success_rate = (successes / out_count) * 100 if out_count else 0
+        print(f"{str(timedelta(seconds=bucket_start)).zfill(8)}\t{in_count}\t{out_count}\t{successes}\t{success_rate:.2f}%\t\t"
+              f"{cis_declines}\t\t{non_cis_declines}\t\t{format_top_codes(top_codes)}")
+    print("==============================================================================")
+
+def write_rollup_csv(rollup, date, csv_path, window=None):
+    """Write one row per active bucket, with a count column for every response code seen."""
+    response_codes = sorted(rollup.response_codes, key=response_code_order)
+    try:
+        with open(csv_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['time', 'in_messages', 'out_messages', 'successful', 'success_rate', 'cis_declines',
+                             'non_cis_declines', 'top_response_codes'] + [f'response_code_{code}' for code in response_codes])
+            for row in rollup.rows(window):
+                bucket_start, in_count, out_count, successes, cis_declines, non_cis_declines, top_codes = row
+                bucket = bucket_start // rollup.bucket_seconds
+                writer.writerow([seconds_to_datetime(date, bucket_start).strftime('%Y-%m-%d %H:%M:%S'), in_count, out_count,
+                                 successes, f"{(successes / out_count) * 100 if out_count else 0:.2f}", cis_declines,
+                                 non_cis_declines, format_top_codes(top_codes)]
+                                + [rollup.response_codes[code][bucket] for code in response_codes])
+        print(f"Time series written to {csv_path}")
+    except OSError as e:
+        print(f"Error writing time series {csv_path}: {e}")
+
+def print_latency_report(correlator):
+    print("\n================IN/OUT Latency by Response Code (ms)==========================")
+    print("Response Code\tMatched\t\t" + "\t".join(f"p{percent}" for percent in LATENCY_PERCENTILES) + "\tMax")
+    overall = LatencyHistogram()
+    for response_code in sorted(correlator.latencies, key=response_code_order):
+        histogram = correlator.latencies[response_code]
+        overall.merge(histogram)
+        percentiles = "\t".join(str(histogram.percentile(percent)) for percent in LATENCY_PERCENTILES)
+        print(f"{response_code.ljust(15)}\t{histogram.count}\t\t{percentiles}\t{histogram.max}")
+    if overall.count:
+        percentiles = "\t".join(str(overall.percentile(percent)) for percent in LATENCY_PERCENTILES)
+        print(f"{'All'.ljust(15)}\t{overall.count}\t\t{percentiles}\t{overall.max}")
+    print(f"Matched IN/OUT pairs: {correlator.matched}")
+    print(f"Unmatched IN_MESSAGE (no OUT_MESSAGE within {correlator.timeout_ms // 1000}s): {correlator.unmatched_ins()}")
+    print(f"Unmatched OUT_MESSAGE (no IN_MESSAGE): {correlator.unmatched_outs()}")
+    print("==============================================================================")
+
+def print_top_values(title, sketch, top_k):
+    print(f"\nTop {title} (Space-Saving; counts overestimate by at most {sketch.max_error()}):")
+    print(f"{title.ljust(25)}\tCount\t\tMax Overcount")
+    for value, count, error in sketch.top(top_k):
+        print(f"{value.ljust(25)}\t{count}\t\t{error}")
+
+def print_sketch_report(aggregate):
+    print("\n=========================Distinct and Top-K Statistic=========================")
+    if aggregate.in_uuids is not None:
+        error = aggregate.in_uuids.relative_error
+        accuracy = "exact" if not error else f"HyperLogLog estimate, standard error {error * 100:.2f}%"
+        distinct_outs = aggregate.out_uuids.estimate()
+        total_out_messages = aggregate.successful_transactions + aggregate.cis_declines + aggregate.non_cis_declines
+        print(f"Distinct IN_MESSAGE UUIDs: {aggregate.in_uuids.estimate()} ({accuracy})")
+        print(f"Distinct OUT_MESSAGE UUIDs: {distinct_outs} ({accuracy})")
+        if not error:
+            # An estimate's error would swamp the handful of real duplicates, so this needs exact mode
+            print(f"Duplicate OUT_MESSAGE (same UUID answered again): {total_out_messages - distinct_outs}")
+    if aggregate.top_messages is not None:
+        print_top_values('Response Message', aggregate.top_messages, aggregate.top_k)
+        print_top_values('Host Response Code', aggregate.top_host_codes, aggregate.top_k)
+    print("==============================================================================")
+
+def process_log_files(date, original_hostname, start_time=None, end_time=None, workers=None, cache_dir=None, engine='text',
+                      latency=False, rollup=None, csv_path=None, sketches=None):
+    if not is_valid_date(date):
+        print("Invalid date entered. Exiting.")
+        return
+    elif datetime.strptime(date, '%Y-%m-%d').date() > datetime.now().date():
+        print("Future date entered. Exiting.")
+        return
+
+    start_time_total = time.time()
+    log_files = find_log_files(date, original_hostname)
+
+    rollup_seconds = ROLLUP_RESOLUTIONS[rollup] if rollup else None
+    parse_start_time = time.time()
+    # Today's log is still being written, so only historical dates go through the cache;
+    # cached summaries hold counts only, so latency pairing and sketches always re-parse
+    if cache_dir and not latency and not sketches and datetime.strptime(date, '%Y-%m-%d').date() < datetime.now().date():
+        aggregate = process_log_files_cached(log_files, time_window(start_time, end_time), workers, AggregateCache(cache_dir),
+                                             rollup_seconds)
+    elif workers:
+        aggregate = process_log_files_parallel(log_files, time_window(start_time, end_time), workers, engine, latency, rollup_seconds,
+                                               sketches)
+    else:
+        aggregate = process_log_files_serial(log_files, start_time, end_time, engine, latency, rollup_seconds, sketches)
+    for message in aggregate.messages:
+        print(message, end='')
+    parse_elapsed_time = time.time() - parse_start_time
+
+    print_transaction_report(aggregate, date, start_time, end_time)
+    if aggregate.rollup is not None:
+        print_rollup_table(aggregate.rollup, time_window(start_time, end_time))
+        if csv_path:
+            write_rollup_csv(aggregate.rollup, date, csv_path, time_window(start_time, end_time))
+
     end_time_total = time.time()
     elapsed_time_total = end_time_total - start_time_total
     script_name = os.path.basename(__file__)
+    total_lines = aggregate.lines
+    if parse_elapsed_time > 0:
+        print(f"\nParsed {total_lines} lines in {parse_elapsed_time:.2f} seconds ({total_lines / parse_elapsed_time:.0f} lines/sec).")
+    if aggregate.read_stats.bytes_read:
+        print(aggregate.read_stats.summary())
     print(f"\nScript '{script_name}' completed in {elapsed_time_total:.2f} seconds.")
 
+def process_log_file_groups(log_file_groups, window, executor, engine='text', correlate=False, rollup_seconds=None, sketches=None):
+    """Parse groups of log files (per host or per day) on one shared pool and return {group: LogAggregate}."""
+    group_chunks = [(group, chunk) for group, log_files in log_file_groups.items() for chunk in plan_log_chunks(log_files, window=window)]
+    aggregates = {group: LogAggregate(correlate, rollup_seconds, sketches) for group in log_file_groups}
+    worker = partial(process_log_chunk, window=window, engine=engine, correlate=correlate, rollup_seconds=rollup_seconds,
+                     sketches=sketches)
+    chunk_aggregates = executor.map(worker, [chunk for _, chunk in group_chunks])
+    for (group, _), chunk_aggregate in zip(group_chunks, chunk_aggregates):
+        aggregates[group].merge(chunk_aggregate)
+    return aggregates
+
+def print_host_table(host_log_files, aggregates):
+    print("\n=========================Per-Host Statistic===================================")
+    print("Host\t\t\tLog Files\tIN_MESSAGE\tOUT_MESSAGE\tSuccessful\tCIS Decline\tNon-CIS Decline\tSuccess %")
+    for host, aggregate in aggregates.items():
+        total_out_messages = aggregate.successful_transactions + aggregate.cis_declines + aggregate.non_cis_declines
+        success_rate = (aggregate.successful_transactions / total_out_messages) * 100 if total_out_messages else 0
+        print(f"{host.ljust(20)}\t{len(host_log_files[host])}\t\t{aggregate.in_messages}\t\t{total_out_messages}\t\t"
+              f"{aggregate.successful_transactions}\t\t{aggregate.cis_declines}\t\t{aggregate.non_cis_declines}\t\t{success_rate:.2f}%")
+    print("==============================================================================")
+
+def process_host_set(date, hosts, start_time=None, end_time=None, workers=None, cache_dir=None, engine='text',
+                     latency=False, rollup=None, csv_path=None, sketches=None):
+    """Report on several WSO2 nodes at once: per-host rows plus the combined statistics."""
+    if not is_valid_date(date):
+        print("Invalid date entered. Exiting.")
+        return
+    elif datetime.strptime(date, '%Y-%m-%d').date() > datetime.now().date():
+        print("Future date entered. Exiting.")
+        return
+    if not hosts:
+        print("No hosts to analyze. Exiting.")
+        return
+
+    start_time_total = time.time()
+    # Discovery is directory listing on shared storage, so the hosts are walked on threads
+    with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+        host_log_files = dict(zip(hosts, executor.map(partial(find_host_log_files, date), hosts)))
+    for host, log_files in host_log_files.items():
+        if not log_files:
+            print(f"No log files found for {host} on {date}")
+
+    window = time_window(start_time, end_time)
+    rollup_seconds = ROLLUP_RESOLUTIONS[rollup] if rollup else None
+    parse_start_time = time.time()
+    with make_process_pool(workers) as executor:
+        if cache_dir and not latency and not sketches and datetime.strptime(date, '%Y-%m-%d').date() < datetime.now().date():
+            cache = AggregateCache(cache_dir)
+            aggregates = {host: process_log_files_cached(log_files, window, workers, cache, rollup_seconds, executor)
+                          for host, log_files in host_log_files.items()}
+        else:
+            aggregates = process_log_file_groups(host_log_files, window, executor, engine, latency, rollup_seconds, sketches)
+    parse_elapsed_time = time.time() - parse_start_time
+
+    combined = LogAggregate(latency, rollup_seconds, sketches)
+    for host, aggregate in aggregates.items():
+        for message in aggregate.messages:
+            for line in message.splitlines():
+                print(f"[{host}] {line}")
+        combined.merge(aggregate)
+
+    print_host_table(host_log_files, aggregates)
+    print(f"\nCombined statistics for {len(hosts)} host(s): {', '.join(hosts)}")
+    print_transaction_report(combined, date, start_time, end_time)
+    if combined.rollup is not None:
+        print_rollup_table(combined.rollup, window)
+        if csv_path:
+            write_rollup_csv(combined.rollup, date, csv_path, window)
+
+    elapsed_time_total = time.time() - start_time_total
+    if parse_elapsed_time > 0:
+        print(f"\nParsed {combined.lines} lines in {parse_elapsed_time:.2f} seconds ({combined.lines / parse_elapsed_time:.0f} lines/sec).")
+    if combined.read_stats.bytes_read:
+        print(combined.read_stats.summary())
+    print(f"\nScript '{os.path.basename(__file__)}' completed in {elapsed_time_total:.2f} seconds.")
+
+def aggregate_stats(aggregate, date=None):
+    """Plain-dict view of an aggregate for the JSON/CSV batch output."""
+    total_out_messages = aggregate.successful_transactions + aggregate.cis_declines + aggregate.non_cis_declines
+    dropped_message_percentage = 0.0
+    if aggregate.in_messages > total_out_messages:
+        dropped_message_percentage = round(((aggregate.in_messages - total_out_messages) / aggregate.in_messages) * 100, 2)
+    stats = {
+        'lines': aggregate.lines,
+        'in_messages': aggregate.in_messages,
+        'out_messages': total_out_messages,
+        'certificate_messages': aggregate.certificate_messages,
+        'successful_transactions': aggregate.successful_transactions,
+        'failed_transactions': total_out_messages - aggregate.successful_transactions,
+        'cis_declines': aggregate.cis_declines,
+        'non_cis_declines': aggregate.non_cis_declines,
+        'dropped_message_percentage': dropped_message_percentage,
+        'read_errors': aggregate.read_errors,
+    }
+    if date:
+        for field, seconds in (('first_log_time', aggregate.earliest_seconds), ('last_log_time', aggregate.latest_seconds)):
+            log_time = seconds_to_datetime(date, seconds)
+            stats[field] = log_time.strftime('%Y-%m-%d %H:%M:%S') if log_time else None
+    stats['response_codes'] = [
+        {'response_code': response_code, 'response_message': response_message, 'host_response_code': host_response_code, 'count': count}
+        for (response_code, response_message, host_response_code), count in aggregate.response_counts.most_common()
+    ]
+    correlator = aggregate.correlator
+    if correlator is not None:
+        stats['latency_ms'] = {
+            response_code: {'count': histogram.count, **{f'p{percent}': histogram.percentile(percent) for percent in LATENCY_PERCENTILES},
+                            'max': histogram.max}
+            for response_code, histogram in sorted(correlator.latencies.items(), key=lambda item: response_code_order(item[0]))
+        }
+        stats['matched_pairs'] = correlator.matched
+        stats['unmatched_in_messages'] = correlator.unmatched_ins()
+        stats['unmatched_out_messages'] = correlator.unmatched_outs()
+    if aggregate.in_uuids is not None:
+        stats['distinct_in_uuids'] = aggregate.in_uuids.estimate()
+        stats['distinct_out_uuids'] = aggregate.out_uuids.estimate()
+        stats['distinct_relative_error'] = round(aggregate.in_uuids.relative_error, 4)
+    if aggregate.top_messages is not None:
+        for field, sketch in (('top_response_messages', aggregate.top_messages), ('top_host_response_codes', aggregate.top_host_codes)):
+            stats[field] = [{'value': value, 'count': count, 'max_overcount': error} for value, count, error in sketch.top(aggregate.top_k)]
+    return stats
+
+def write_batch_report(report, output_format, output_path):
+    """Write the batch report as JSON, or as CSV with one row per day and a final 'total' row."""
+    with contextlib.ExitStack() as stack:
+        file = sys.stdout if output_path == '-' else stack.enter_context(open(output_path, 'w', newline=''))
+        if output_format == 'json':
+            file.write(json.dumps(report, indent=2) + '\n')
+        else:
+            writer = csv.DictWriter(file, fieldnames=BATCH_CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(report['days'])
+            writer.writerow({'date': 'total', **report['total']})
+
+def batch_date_range(args):
+    """Return (from_date, to_date) from the batch arguments, or None after printing why they are unusable."""
+    from_date = args.from_date or args.date
+    to_date = args.to_date or from_date
+    if not is_valid_date(from_date) or not is_valid_date(to_date):
+        print("Invalid date format, expected YYYY-MM-DD.", file=sys.stderr)
+        return None
+    if to_date < from_date:
+        print("The end date is before the start date.", file=sys.stderr)
+        return None
+    if datetime.strptime(to_date, '%Y-%m-%d').date() > datetime.now().date():
+        print("Future date entered.", file=sys.stderr)
+        return None
+    return from_date, to_date
+
+def run_batch(args, workers=None, cache_dir=None):
+    """Non-interactive report over a date range; returns one of the EXIT_* codes."""
+    date_bounds = batch_date_range(args)
+    if date_bounds is None:
+        return EXIT_USAGE
+    from_date, to_date = date_bounds
+    start_time, end_time = args.start_time, args.end_time
+    if bool(start_time) != bool(end_time) or (start_time and not (is_valid_time(start_time) and is_valid_time(end_time))):
+        print("Give both --start-time and --end-time as HH:MM:SS.", file=sys.stderr)
+        return EXIT_USAGE
+
+    hosts = expand_hosts(args.hosts) if args.hosts else [socket.gethostname()]
+    dates = date_range(from_date, to_date)
+    window = time_window(start_time, end_time)
+    today = datetime.now().date()
+    sketches = make_sketch_options(args.distinct, max(args.top_k, 0))
+
+    def discover(date):
+        if args.hosts:
+            return [log_file for host in hosts for log_file in find_host_log_files(date, host)]
+        return find_log_files(date, hosts[0])
+
+    try:
+        # Diagnostics go to stderr so stdout carries only the report
+        with contextlib.redirect_stdout(sys.stderr):
+            with ThreadPoolExecutor(max_workers=min(len(dates), 8)) as executor:
+                day_log_files = dict(zip(dates, executor.map(discover, dates)))
+
+            # Every day's chunks share one pool, so the workers start once for the whole range
+            with make_process_pool(workers) as executor:
+                cached_dates = [date for date in dates
+                                if cache_dir and not args.latency and not sketches and datetime.strptime(date, '%Y-%m-%d').date() < today]
+                cache = AggregateCache(cache_dir) if cache_dir else None
+                aggregates = {date: process_log_files_cached(day_log_files[date], window, workers, cache, executor=executor)
+                              for date in cached_dates}
+                aggregates.update(process_log_file_groups({date: day_log_files[date] for date in dates if date not in aggregates},
+                                                          window, executor, args.engine, args.latency, sketches=sketches))
+
+            total = LogAggregate(args.latency, sketches=sketches)
+            days = []
+            for date in dates:
+                aggregate = aggregates[date]
+                for message in aggregate.messages:
+                    for line in message.splitlines():
+                        print(f"[{date}] {line}")
+                total.merge(aggregate)
+                days.append({'date': date, 'log_files': len(day_log_files[date]), **aggregate_stats(aggregate, date)})
+
+        total_stats = {'log_files': sum(day['log_files'] for day in days), **aggregate_stats(total)}
+        days_with_logs = [day for day in days if day['first_log_time']]
+        total_stats['first_log_time'] = days_with_logs[0]['first_log_time'] if days_with_logs else None
+        total_stats['last_log_time'] = days_with_logs[-1]['last_log_time'] if days_with_logs else None
+        report = {
+            'from_date': from_date,
+            'to_date': to_date,
+            'start_time': start_time,
+            'end_time': end_time,
+            'hosts': hosts,
+            'days': days,
+            'total': total_stats,
+        }
+        write_batch_report(report, args.format, args.output)
+    except Exception as e:
+        print(f"Error running batch report: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    missing_dates = [date for date in dates if not day_log_files[date]]
+    if len(missing_dates) == len(dates):
+        print(f"No log files found between {from_date} and {to_date}.", file=sys.stderr)
+        return EXIT_NO_LOGS
+    if missing_dates or total.read_errors:
+        if missing_dates:
+            print(f"No log files found for: {', '.join(missing_dates)}", file=sys.stderr)
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+def run_ingest(args):
+    """Load every OUT_MESSAGE response of a date range into the response store; returns one of the EXIT_* codes.
+
+    Files already ingested at their current size and mtime are skipped, so re-running over the
+    same range only parses logs that are new or have grown since. A day that took new rows is then
+    checked for responses whose actualResponseCode did not reach its column.
+    """
+    date_bounds = batch_date_range(args)
+    if date_bounds is None:
+        return EXIT_USAGE
+    from_date, to_date = date_bounds
+    hosts = expand_hosts(args.hosts) if args.hosts else [socket.gethostname()]
+    dates = date_range(from_date, to_date)
+    store = ResponseStore(args.store_dir)
+
+    def discover(date):
+        if args.hosts:
+            return [log_file for host in hosts for log_file in find_host_log_files(date, host)]
+        return find_log_files(date, hosts[0])
+
+    missing_dates = []
+    failed_files = 0
+    damaged_dates = []
+    with contextlib.redirect_stdout(sys.stderr):
+        with ThreadPoolExecutor(max_workers=min(len(dates), 8)) as executor:
+            day_log_files = dict(zip(dates, executor.map(discover, dates)))
+
+    for date in dates:
+        if not day_log_files[date]:
+            missing_dates.append(date)
+            continue
+        ingested = False
+        for log_file in day_log_files[date]:
+            if isinstance(log_file, LogArchive):
+                path, tag = log_file.archive_path, f":{log_file.member_prefix}"
+            else:
+                path, tag = log_file, ''
+            try:
+                rows = store.ingest_file(date, path, lambda: iter_response_records(iter_log_lines(log_file)), tag)
+            except (OSError, EOFError, tarfile.TarError, sqlite3.Error) as e:
+                print(f"Error ingesting {log_file}: {e}", file=sys.stderr)
+                failed_files += 1
+                continue
+            if rows == SOURCE_MISSING:
+                print(f"Error ingesting {log_file}: file not found", file=sys.stderr)
+                failed_files += 1
+            elif rows is None:
+                print(f"[{date}] {log_file}: already ingested", file=sys.stderr)
+            else:
+                print(f"[{date}] {log_file}: {rows} responses", file=sys.stderr)
+                ingested = True
+        if ingested:
+            # Self-check: every actualResponseCode in a stored payload must also be in its column
+            try:
+                with store.reader(date) as partition:
+                    lost = partition.lost_actual_codes()
+            except sqlite3.Error as e:
+                print(f"Error checking the {date} partition: {e}", file=sys.stderr)
+                lost = 1
+            if lost:
+                print(f"[{date}] {lost} stored responses lost their actualResponseCode", file=sys.stderr)
+                damaged_dates.append(date)
+
+    if len(missing_dates) == len(dates):
+        print(f"No log files found between {from_date} and {to_date}.", file=sys.stderr)
+        return EXIT_NO_LOGS
+    if missing_dates or failed_files or damaged_dates:
+        if missing_dates:
+            print(f"No log files found for: {', '.join(missing_dates)}", file=sys.stderr)
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+class LogFollower:
+    """Parses only the bytes appended to a live log, reopening it when it is rotated or truncated."""
+
+    def __init__(self, file_path, window=None, correlate=False):
+        self.file_path = file_path
+        self.window = window
+        self.correlate = correlate
+        self.aggregate = LogAggregate(correlate)
+        self.file = None
+        self.inode = None
+        self.position = 0
+        self.pending = b''
+        self.rotations = 0
+
+    def open(self):
+        try:
+            self.file = open(self.file_path, 'rb')
+        except FileNotFoundError:
+            self.file = None
+            return False
+        self.inode = os.fstat(self.file.fileno()).st_ino
+        self.position = 0
+        self.pending = b''
+        return True
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def read_new_lines(self):
+        """Parse the complete lines appended since the last call; a trailing partial line waits for the next one."""
+        while self.file:
+            data = self.file.read(FOLLOW_READ_BYTES)
+            if not data:
+                break
+            self.position += len(data)
+            data = self.pending + data
+            cut = data.rfind(b'\n') + 1
+            self.pending = data[cut:]
+            if cut:
+                scan_log_lines(decode_log_lines(io.BytesIO(data[:cut])), self.aggregate, self.window)
+
+    def check_rotation(self):
+        """Reopen the log if the path now names a new file (inode change) or the file shrank (truncation)."""
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            # Rotated away and not recreated yet; keep reading the old file until it is
+            return False
+        if stat.st_ino == self.inode and stat.st_size >= self.position:
+            return False
+        if stat.st_ino != self.inode:
+            # Pick up whatever was written to the old file before it was renamed
+            self.read_new_lines()
+            if self.pending:
+                scan_log_lines(decode_log_lines([self.pending]), self.aggregate, self.window)
+        self.close()
+        self.open()
+        self.rotations += 1
+        return True
+
+def follow_log_file(file_path, date, interval=FOLLOW_INTERVAL_SECONDS, start_time=None, end_time=None, latency=False):
+    """Keep the live log open and redraw the report every interval seconds from incrementally updated counters."""
+    follower = LogFollower(file_path, time_window(start_time, end_time), latency)
+    try:
+        while True:
+            if follower.file is None and not follower.open():
+                print(f"Waiting for {file_path} to appear...")
+            follower.read_new_lines()
+            if follower.check_rotation():
+                today = datetime.now().strftime('%Y-%m-%d')
+                if today != date:
+                    # Midnight rotation: the report is for the new day from here on
+                    date = today
+                    follower.aggregate = LogAggregate(follower.correlate)
+                follower.read_new_lines()
+
+            print(CLEAR_SCREEN, end='')
+            print_transaction_report(follower.aggregate, date, start_time, end_time)
+            print(f"\nFollowing {file_path}: refreshed at {datetime.now().strftime('%H:%M:%S')}, every {interval}s, "
+                  f"{follower.rotations} rotation(s). Press Ctrl+C to stop.")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped following.")
+    finally:
+        follower.close()
+
 def get_alternate_hostname(hostname):
     if hostname.endswith('01'):
         return hostname[:-2] + '02'
@@ -280,10 +1878,87 @@ def get_alternate_hostname(hostname):
     else:
         raise ValueError("Hostname does not end in '01' or '02'")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Analyze wso2carbon transaction logs.')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Parse log files on a pool of N processes (0 = one per CPU).')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='Directory for cached per-file aggregates of historical dates.')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always re-parse the log files instead of using the aggregate cache.')
+    parser.add_argument('--engine', choices=ENGINES, default='text',
+                        help="Line parser: 'text' decodes every line, 'bytes' scans an mmap and decodes only responses.")
+    parser.add_argument('--read-ahead-mb', type=int, default=PREFETCH_CHUNK_BYTES // (1024 * 1024),
+                        help='Chunk size in MB for the background read-ahead of plain logs (0 = plain buffered reads).')
+    parser.add_argument('--read-ahead-depth', type=int, default=PREFETCH_DEPTH,
+                        help='Read-ahead chunks that may be in flight at once (2 = double buffering).')
+    parser.add_argument('--extract-archives', action='store_true',
+                        help="Extract the date's members of archived logs into a local cache and reuse them on later runs, "
+                             "instead of streaming the tarball every time.")
+    parser.add_argument('--extract-dir', default=DEFAULT_EXTRACT_DIR, help='Directory of the archive extraction cache.')
+    parser.add_argument('--extract-cache-mb', type=int, default=DEFAULT_EXTRACT_MAX_BYTES // (1024 * 1024),
+                        help='Disk budget in MB for extracted archives; least recently used dates are evicted beyond it.')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time every parsing engine on the selected logs instead of printing the report.')
+    parser.add_argument('--self-check', action='store_true',
+                        help='Check on generated logs that the serial and --workers paths pair IN/OUT messages alike, and exit.')
+    parser.add_argument('-f', '--follow', action='store_true',
+                        help="Keep today's wso2carbon.log open and refresh the report as lines are appended.")
+    parser.add_argument('--interval', type=int, default=FOLLOW_INTERVAL_SECONDS,
+                        help='Seconds between report refreshes in --follow mode.')
+    parser.add_argument('--latency', action='store_true',
+                        help='Pair IN_MESSAGE and OUT_MESSAGE by UUID and report latency percentiles per response code.')
+    parser.add_argument('--rollup', choices=sorted(ROLLUP_RESOLUTIONS), default=None,
+                        help='Also print per-minute or per-second IN/OUT/decline counts as a time series.')
+    parser.add_argument('--csv', dest='csv_path', default=None,
+                        help='Write the time series to this CSV file (implies --rollup minute).')
+    parser.add_argument('--distinct', choices=DISTINCT_MODES, default=None,
+                        help="Count distinct UUIDs: 'approx' with a fixed-size HyperLogLog (~0.8%% error), 'exact' with a set.")
+    parser.add_argument('--top-k', type=int, default=0,
+                        help='Report the N most frequent responseMessage/hostResponseCode values from fixed-size '
+                             'Space-Saving sketches; the detailed response table then omits the free-text message.')
+    batch = parser.add_argument_group('batch mode', 'Giving --date or --from-date skips the prompts and writes a machine-readable report.')
+    batch.add_argument('--date', default=None, help='Report on this single day (YYYY-MM-DD).')
+    batch.add_argument('--from-date', default=None, help='First day of the range to report on (YYYY-MM-DD).')
+    batch.add_argument('--to-date', default=None, help='Last day of the range, inclusive (default: --from-date).')
+    batch.add_argument('--start-time', default=None, help='Only count lines from this time of day (HH:MM:SS).')
+    batch.add_argument('--end-time', default=None, help='Only count lines up to this time of day (HH:MM:SS).')
+    batch.add_argument('--format', choices=BATCH_FORMATS, default='json', help='Report format for batch mode.')
+    batch.add_argument('--output', default='-', help="Report file for batch mode ('-' for stdout).")
+    batch.add_argument('--ingest', action='store_true',
+                       help="Load the range's OUT_MESSAGE responses into the response store instead of reporting; "
+                            "query it afterwards with 'log_store.py query'.")
+    batch.add_argument('--store-dir', default=DEFAULT_STORE_DIR, help='Directory for the per-date response store.')
+    parser.add_argument('--hosts', default=None,
+                        help="Comma-separated hostnames or glob patterns (e.g. 'apigw-use1-*') to report on together, "
+                             "with per-host and combined statistics.")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    workers = args.workers
+    if workers == 0:
+        workers = os.cpu_count()
+    cache_dir = None if args.no_cache else args.cache_dir
+    configure_read_ahead(max(args.read_ahead_mb, 0) * 1024 * 1024, max(args.read_ahead_depth, 1))
+    if args.extract_archives:
+        configure_extraction(args.extract_dir, max(args.extract_cache_mb, 0) * 1024 * 1024)
+    rollup = args.rollup or ('minute' if args.csv_path else None)
+    sketches = make_sketch_options(args.distinct, max(args.top_k, 0))
     original_hostname = socket.gethostname()
 
-    today = input("Is it today's date? (yes/no): ").strip().lower()
+    if args.self_check:
+        return self_check(workers or 2)
+    if args.date or args.from_date:
+        if args.ingest:
+            return run_ingest(args)
+        return run_batch(args, workers, cache_dir)
+
+    if args.follow:
+        # Only today's log is still being written
+        today = 'yes'
+    else:
+        today = input("Is it today's date? (yes/no): ").strip().lower()
     if today == 'yes':
         date = datetime.now().strftime('%Y-%m-%d')
     else:
@@ -295,6 +1970,7 @@ def main():
             print("Future date entered. Exiting.")
             return
 
+    start_time = end_time = None
     use_time_range = input("Do you want to specify a time range? (yes/no): ").strip().lower()
     if use_time_range == 'yes':
         start_time = input("Enter the start time (HH:MM:SS): ").strip()
@@ -302,9 +1978,18 @@ def main():
         if not is_valid_time(start_time) or not is_valid_time(end_time):
             print("Invalid time format. Exiting.")
             return
-        process_log_files(date, original_hostname, start_time, end_time)
+
+    if args.hosts and not (args.follow or args.benchmark):
+        process_host_set(date, expand_hosts(args.hosts), start_time, end_time, workers=workers, cache_dir=cache_dir,
+                         engine=args.engine, latency=args.latency, rollup=rollup, csv_path=args.csv_path, sketches=sketches)
+    elif args.follow:
+        follow_log_file(os.path.join(LOG_DIRECTORY_TODAY, 'wso2carbon.log'), date, args.interval, start_time, end_time,
+                        args.latency)
+    elif args.benchmark:
+        benchmark_log_engines(date, original_hostname, start_time, end_time)
     else:
-        process_log_files(date, original_hostname)
+        process_log_files(date, original_hostname, start_time, end_time, workers=workers, cache_dir=cache_dir, engine=args.engine,
+                          latency=args.latency, rollup=rollup, csv_path=args.csv_path, sketches=sketches)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())